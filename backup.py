@@ -3,7 +3,7 @@ import subprocess
 import datetime
 import logging
 import shutil
-from db_connector import get_connection
+from db_connector import pooled_connection, load_config
 
 # ---------------------------
 # Logging Setup
@@ -63,24 +63,15 @@ def backup_database():
 
         print("Using mysqldump at:", mysqldump_path)
 
-        conn = get_connection()
-        if conn is None:
-            raise Exception("Database connection failed")
+        with pooled_connection() as conn:
+            database = conn.database
+            host = conn.server_host
+            user = conn.user
 
         create_backup_directory()
 
-        database = conn.database
-        host = conn.server_host
-        user = conn.user
-
-        conn.close()
-
-        # Get password from config.ini
-        import configparser
-        config_path = os.path.join(os.path.dirname(__file__), 'config', 'config.ini')
-        config = configparser.ConfigParser()
-        config.read(config_path)
-        password = config['mysql']['password']
+        # Get password from config.ini (cached by db_connector)
+        password = load_config()['mysql']['password']
 
         # Backup filename
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
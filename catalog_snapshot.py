@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import shutil
+import datetime
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:     # Windows: no cross-process lock, every process refreshes on its own
+    fcntl = None
+
+# --------------------------------------
+# COMPACT COLUMN TYPES
+# --------------------------------------
+STRING_COLUMNS = ["product_name", "brand_name", "brand_image",
+                  "sub_category_name", "category_name", "category_image"]
+ID_COLUMNS = ["product_id", "brand_id", "category_id", "mst_category_id", "sub_category_id"]
+PRICE_COLUMNS = ["price", "mrp", "discount"]
+
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = ".lock"
+KEEP_SNAPSHOTS = 3
+
+
+def compact_ids(series):
+    values = pd.to_numeric(series, errors="coerce")
+
+    if values.isna().any():
+        # NULL ids must never compare equal, so they stay NaN in a float array
+        # (float32 is exact for ids below 2**24)
+        return values.astype(np.float32 if values.abs().max() < 2 ** 24 else np.float64)
+
+    ints = values.astype(np.int64)
+    if len(ints) == 0 or (ints.min() >= np.iinfo(np.int32).min and ints.max() <= np.iinfo(np.int32).max):
+        return ints.astype(np.int32)
+    return ints
+
+
+def compact_frame(df):
+    """Dictionary-encoded strings, narrow integer ids and float64 prices"""
+    columns = {}
+    for col in df.columns:
+        if col in STRING_COLUMNS:
+            columns[col] = df[col].astype("category")
+        elif col in ID_COLUMNS:
+            columns[col] = compact_ids(df[col])
+        elif col in PRICE_COLUMNS:
+            # float64, not float32: the 10% price rule and cents in the output must match the old scorer
+            columns[col] = pd.to_numeric(df[col], errors="coerce").astype(np.float64)
+        else:
+            columns[col] = df[col]
+    return pd.DataFrame(columns)
+
+
+# --------------------------------------
+# JSON HELPERS
+# --------------------------------------
+def encode_value(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime.datetime)):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def decode_value(value):
+    if isinstance(value, dict) and "datetime" in value:
+        return datetime.datetime.fromisoformat(value["datetime"])
+    return value
+
+
+# --------------------------------------
+# SAVE / MAP SNAPSHOTS
+# --------------------------------------
+def save_snapshot(directory, df, meta):
+    """Write every column as its own .npy file and point CURRENT at the new snapshot"""
+    name = f"catalog-{int(time.time() * 1000)}"
+    path = os.path.join(directory, name)
+    os.makedirs(path)
+
+    meta = dict(meta, rows=len(df), columns=[])
+
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(path, f"{col}.npy"), series.cat.codes.to_numpy())
+            meta["columns"].append({
+                "name": col,
+                "kind": "category",
+                "categories": [encode_value(c) for c in series.cat.categories],
+            })
+        else:
+            np.save(os.path.join(path, f"{col}.npy"), series.to_numpy())
+            meta["columns"].append({"name": col, "kind": "array"})
+
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    # Readers only ever follow CURRENT, so swapping it is the publish step
+    tmp = os.path.join(directory, CURRENT_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(tmp, os.path.join(directory, CURRENT_FILE))
+
+    prune_snapshots(directory, keep=name)
+    return name
+
+
+def prune_snapshots(directory, keep):
+    names = sorted(n for n in os.listdir(directory) if n.startswith("catalog-"))
+    for name in names[:-KEEP_SNAPSHOTS]:
+        if name != keep:
+            # Workers still mapping an old snapshot keep their pages on POSIX
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+def read_current(directory):
+    """(name, meta) of the published snapshot, or (None, None)"""
+    try:
+        with open(os.path.join(directory, CURRENT_FILE), encoding="utf-8") as f:
+            name = f.read().strip()
+        with open(os.path.join(directory, name, "meta.json"), encoding="utf-8") as f:
+            return name, json.load(f)
+    except (OSError, ValueError):
+        return None, None
+
+
+def open_snapshot(directory, name, meta):
+    """Map a snapshot read-only; the numeric pages are shared by every process that maps it"""
+    path = os.path.join(directory, name)
+    columns = {}
+
+    for col in meta["columns"]:
+        array = np.load(os.path.join(path, f"{col['name']}.npy"), mmap_mode="r")
+        if col["kind"] == "category":
+            columns[col["name"]] = pd.Categorical.from_codes(array, categories=col["categories"])
+        else:
+            columns[col["name"]] = array
+
+    return pd.DataFrame(columns, copy=False)
+
+
+@contextmanager
+def refresh_lock(directory):
+    """Yields True for the one process allowed to refresh from MySQL right now"""
+    if fcntl is None:
+        yield True
+        return
+
+    with open(os.path.join(directory, LOCK_FILE), "w") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -1,6 +1,6 @@
 from flask import Flask, jsonify, request
 import pandas as pd
-from db_connector import get_connection
+from db_connector import pooled_connection
 import os
 
 app = Flask(__name__)
@@ -11,12 +11,11 @@ os.makedirs(CLEANED_DIR, exist_ok=True)
 
 # Fetch data from DB dynamically
 def get_data(table_name):
-    conn = get_connection()
     # Using safe string formatting to prevent SQL injection
     query = f"SELECT * FROM `{table_name}`"
-    df = pd.read_sql(query, conn)
-    conn.close()
-    return df
+    # Returned to the pool even when read_sql raises (e.g. unknown table)
+    with pooled_connection() as conn:
+        return pd.read_sql(query, conn)
 
 # Data cleaning
 def clean_data(df):
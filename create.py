@@ -1,39 +1,293 @@
-from flask import Flask, request, redirect, render_template, jsonify
-from db_connector import get_connection
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, request, redirect, render_template, jsonify, Response, stream_with_context
+from db_connector import get_connection, load_config
+from delete_state import DeleteState, DEFAULT_STATE_FILE
+from schema_catalog import get_table, invalidate_schema
+from fast_response import FORMATS, encode_json, rows_response
+from view_query import QueryError, parse_filters, parse_order, parse_aggregates, check_scan
+from view_cache import view_cache, table_version, bump_version
 
 app = Flask(__name__)
 
 # ------------------ READ ------------------
+VIEW_CHUNK_SIZE = 1000      # rows per fetchmany() when streaming
+VIEW_MAX_LIMIT = 10000      # biggest page a client can ask for
+VIEW_MAX_SCAN_ROWS = load_config().getint('view', 'max_scan_rows', fallback=500000)
+
+# Query-string names that are options, not column filters
+VIEW_PARAMS = {"fields", "key", "limit", "after_id", "stream", "count", "order_by", "group_by", "agg", "format", "decimals", "dates"}
+
+
+def get_row_count(cursor, table_name, mode="exact", where_sql="", where_params=()):
+    # approx reads InnoDB's estimate instead of scanning the table
+    if mode == "none":
+        return None
+
+    if mode == "approx":
+        if where_sql:
+            # The estimate is for the whole table, not for the filtered rows
+            return None
+        cursor.execute("""
+            SELECT table_rows AS total
+            FROM information_schema.tables
+            WHERE table_schema = DATABASE()
+              AND table_name = %s
+        """, (table_name,))
+        row = cursor.fetchone()
+        return row["total"] if row else None
+
+    cursor.execute(f"SELECT COUNT(*) AS total FROM `{table_name}`{where_sql}", tuple(where_params))
+    return cursor.fetchone()["total"]
+
+
+def is_unique_key(table, name):
+    # keyset paging needs a single-column PRIMARY KEY or NOT NULL UNIQUE column
+    if table.primary_key == [name]:
+        return True
+    column = table.column(name)
+    return column is not None and column.key == "UNI" and not column.nullable
+
+
 #only http://127.0.0.1:5000/view/uusers to view users data
+#http://127.0.0.1:5000/view/uusers?limit=500&after_id=1000&fields=id,name&count=approx for one page
+#http://127.0.0.1:5000/view/uusers?stream=1 to stream every row as NDJSON
+#http://127.0.0.1:5000/view/uusers?city=Pune&age__gte=18&status__in=a,b&name__like=Su%25&order_by=-id&limit=50 filters
+#http://127.0.0.1:5000/view/uusers?group_by=city&agg=count,sum:amount to aggregate in the database
+#http://127.0.0.1:5000/view/uusers?format=csv or format=arrow for bulk consumers; send Accept-Encoding: gzip / zstd
+#DECIMAL columns come back as strings; decimals=float sends JSON numbers instead (may lose precision)
+#dates are HTTP dates ("Tue, 02 Jan 2024 03:04:05 GMT", "2024-01-02 03:04:05" when streamed); dates=iso sends ISO 8601
+#every non-streamed response has an ETag; send it back as If-None-Match to get 304 while the table is unchanged
 @app.route("/view/<table_name>", methods=["GET"])
 def view_table(table_name):
 
-    try:
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
+    conn = None
+    streaming = False
 
-        # Check table exists
-        cursor.execute("SHOW TABLES LIKE %s", (table_name,))
-        if not cursor.fetchone():
+    try:
+        # Check table exists (cached schema metadata, no round-trip)
+        table = get_table(table_name)
+        if table is None:
             return jsonify({
                 "status": "error",
                 "message": f"Table '{table_name}' does not exist"
             }), 400
 
-        # Get row count
-        cursor.execute(f"SELECT COUNT(*) AS total FROM {table_name}")
-        count = cursor.fetchone()["total"]
+        table_cols = table.column_names
+
+        # Column projection
+        fields = request.args.get("fields")
+        if fields:
+            fields = [f.strip() for f in fields.split(",") if f.strip()]
+            unknown = [f for f in fields if f not in table_cols]
+            if unknown:
+                return jsonify({
+                    "status": "error",
+                    "message": f"Unknown column(s): {unknown}"
+                }), 400
+        else:
+            fields = table_cols
+
+        key = request.args.get("key", "id")
+        limit = request.args.get("limit", type=int)
+        after_id = request.args.get("after_id")
+        stream = request.args.get("stream", "0").lower() in ("1", "true", "yes")
+        grouped = "group_by" in request.args or "agg" in request.args
+        fmt = request.args.get("format", "json")
+        decimals = request.args.get("decimals", "string")
+
+        if decimals not in ("string", "float"):
+            return jsonify({
+                "status": "error",
+                "message": "decimals must be string or float"
+            }), 400
+        decimal_as_float = decimals == "float"
+
+        dates = request.args.get("dates", "default")
+        if dates not in ("default", "iso"):
+            return jsonify({
+                "status": "error",
+                "message": "dates must be default or iso"
+            }), 400
+        # default keeps what each path always sent: jsonify's HTTP dates, str() in the stream
+        date_format = "iso" if dates == "iso" else "str" if stream else "http"
+
+        if fmt not in FORMATS:
+            return jsonify({
+                "status": "error",
+                "message": f"format must be one of {list(FORMATS)}"
+            }), 400
+
+        if stream and fmt != "json":
+            return jsonify({
+                "status": "error",
+                "message": "stream=1 always sends NDJSON, drop format"
+            }), 400
+
+        # Filters, ordering and aggregates; every identifier is checked against the schema catalog
+        try:
+            where_sql, where_params = parse_filters(request.args, table, VIEW_PARAMS)
+            order_sql = parse_order(request.args.get("order_by", ""), table)
+            if grouped:
+                agg_select, group_sql = parse_aggregates(
+                    request.args.get("group_by"), request.args.get("agg"), table
+                )
+        except QueryError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+
+        if after_id is not None and (order_sql or grouped):
+            return jsonify({
+                "status": "error",
+                "message": "after_id pages by key and cannot be combined with order_by or group_by"
+            }), 400
+
+        if grouped and stream:
+            return jsonify({
+                "status": "error",
+                "message": "group_by cannot be streamed"
+            }), 400
+
+        paged = limit is not None or after_id is not None
+        keyset = paged and not order_sql and not grouped
+
+        count_default = "exact" if limit is None and not stream and not grouped else "none"
+        count_mode = request.args.get("count", count_default)
+
+        if count_mode not in ("exact", "approx", "none"):
+            return jsonify({
+                "status": "error",
+                "message": "count must be one of exact, approx, none"
+            }), 400
+
+        if keyset and key not in table_cols:
+            return jsonify({
+                "status": "error",
+                "message": f"Key column '{key}' does not exist in {table_name}"
+            }), 400
+
+        # "> last key" skips rows that tie across a page boundary, so the key must be unique
+        # (and indexed, which PRI / UNI are); NULLs would never be paged either
+        if keyset and not is_unique_key(table, key):
+            return jsonify({
+                "status": "error",
+                "message": f"Key column '{key}' must be the primary key or a NOT NULL unique column"
+            }), 400
+
+        if limit is not None and not 0 < limit <= VIEW_MAX_LIMIT:
+            return jsonify({
+                "status": "error",
+                "message": f"limit must be between 1 and {VIEW_MAX_LIMIT}"
+            }), 400
+
+        if keyset and key not in fields:
+            fields = [key] + fields
+
+        conn = get_connection()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+
+        # Conditional GET: one cheap version lookup instead of re-reading an unchanged table
+        version = None if stream else table_version(conn, cursor, table_name)
+        cache_key = (table_name, tuple(sorted(request.args.items(multi=True))), version)
+        cache_headers = {"ETag": f'"{version}"', "Cache-Control": "no-cache"} if version else {}
+
+        if version:
+            if request.if_none_match.contains(version):
+                return Response(status=304, headers=cache_headers)
+
+            cached = view_cache.get(cache_key)
+            if cached is not None:
+                result, data, columns, headers = cached
+                return rows_response(result, data, columns, fmt, headers=dict(headers, **cache_headers),
+                                     decimal_as_float=decimal_as_float, dates=date_format)
+
+        params = list(where_params)
+
+        if grouped:
+            sql = f"SELECT {agg_select} FROM `{table_name}`{where_sql}{group_sql}{order_sql}"
+        else:
+            select_cols = ", ".join(f"`{c}`" for c in fields)
+            sql = f"SELECT {select_cols} FROM `{table_name}`{where_sql}"
 
-        # Fetch all data
-        cursor.execute(f"SELECT * FROM {table_name}")
+            # Keyset pagination: WHERE key > last seen key ORDER BY key, never OFFSET
+            if after_id is not None:
+                sql += (" AND " if where_sql else " WHERE ") + f"`{key}` > %s"
+                params.append(after_id)
+            if keyset:
+                sql += f" ORDER BY `{key}`"
+            else:
+                sql += order_sql
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit)
+
+        # Filtered / sorted / grouped reads must be able to use an index on big tables
+        if where_sql or order_sql or grouped:
+            try:
+                check_scan(cursor, sql, params, VIEW_MAX_SCAN_ROWS)
+            except QueryError as e:
+                return jsonify({
+                    "status": "error",
+                    "message": str(e)
+                }), 400
+
+        count = get_row_count(cursor, table_name, count_mode, where_sql, where_params)
+
+        if stream:
+            # Unbuffered cursor + fetchmany keeps memory flat however big the table is
+            stream_cursor = conn.cursor(dictionary=True, buffered=False)
+            stream_cursor.execute(sql, tuple(params))
+
+            def generate():
+                try:
+                    while True:
+                        rows = stream_cursor.fetchmany(VIEW_CHUNK_SIZE)
+                        if not rows:
+                            break
+                        yield b"".join(encode_json(row, decimal_as_float, date_format) + b"\n" for row in rows)
+                finally:
+                    stream_cursor.close()
+                    conn.close()
+
+            streaming = True
+            headers = {"X-Total-Rows": str(count)} if count is not None else {}
+            return Response(stream_with_context(generate()),
+                            mimetype="application/x-ndjson", headers=headers)
+
+        cursor.execute(sql, tuple(params))
         data = cursor.fetchall()
 
-        return jsonify({
+        result = {
             "status": "success",
             "table": table_name,
             "total_rows": count,
             "data": data
-        }), 200
+        }
+
+        if grouped:
+            result["group_by"] = request.args.get("group_by")
+
+        if paged:
+            result["limit"] = limit
+            result["next_after_id"] = data[-1][key] if keyset and data and len(data) == limit else None
+
+        # csv / arrow carry only the rows, so the paging metadata travels in headers
+        headers = {}
+        if count is not None:
+            headers["X-Total-Rows"] = str(count)
+        if result.get("next_after_id") is not None:
+            headers["X-Next-After-Id"] = str(result["next_after_id"])
+
+        columns = list(cursor.column_names)
+        if version:
+            view_cache.put(cache_key, (result, data, columns, headers), len(data))
+
+        return rows_response(result, data, columns, fmt, headers=dict(headers, **cache_headers),
+                             decimal_as_float=decimal_as_float, dates=date_format)
 
     except Exception as e:
         return jsonify({
@@ -42,12 +296,15 @@ def view_table(table_name):
         }), 500
 
     finally:
-        conn.close()
+        if conn and not streaming:
+            conn.close()
 # ------------------ adding------------------
 #add in form data in postman key and value http://127.0.0.1:5000/add/uusers
 @app.route("/add/<table_name>", methods=["POST"])
 def add_data(table_name):
 
+    conn = None
+
     try:
         # Accept JSON or form-data
         data = request.get_json() if request.is_json else request.form.to_dict()
@@ -58,26 +315,35 @@ def add_data(table_name):
                 "message": "No data provided"
             }), 400
 
-        conn = get_connection()
-        cursor = conn.cursor()
-
         # verify table exists
-        cursor.execute("SHOW TABLES LIKE %s", (table_name,))
-        if not cursor.fetchone():
+        table = get_table(table_name)
+        if table is None:
             return jsonify({
                 "status": "error",
                 "message": f"Table '{table_name}' does not exist"
             }), 400
 
+        # Only real column names ever reach the SQL text
+        unknown = table.unknown_columns(data.keys())
+        if unknown:
+            return jsonify({
+                "status": "error",
+                "message": f"Unknown column(s): {unknown}"
+            }), 400
+
+        conn = get_connection()
+        cursor = conn.cursor()
+
         # build dynamic insert
-        columns = ", ".join(data.keys())
+        columns = ", ".join(f"`{c}`" for c in data.keys())
         placeholders = ", ".join(["%s"] * len(data))
         values = tuple(data.values())
 
-        sql = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
+        sql = f"INSERT INTO `{table_name}` ({columns}) VALUES ({placeholders})"
 
         cursor.execute(sql, values)
         conn.commit()
+        bump_version(table_name)
 
         return jsonify({
             "status": "success",
@@ -86,19 +352,23 @@ def add_data(table_name):
         }), 200
 
     except Exception as e:
-        conn.rollback()
+        if conn:
+            conn.rollback()
         return jsonify({
             "status": "error",
             "message": str(e)
         }), 500
 
     finally:
-        conn.close()
+        if conn:
+            conn.close()
 # ------------------ UPDATE ------------------
 #http://127.0.0.1:5000/update/uusers/1 add in postman key and value to update
 @app.route("/update/<table_name>/<int:id>", methods=["POST"])
 def update_data(table_name, id):
 
+    conn = None
+
     try:
         # Accept JSON or form data
         data = request.get_json() if request.is_json else request.form.to_dict()
@@ -109,39 +379,46 @@ def update_data(table_name, id):
                 "message": "No update data provided"
             }), 400
 
-        conn = get_connection()
-        cursor = conn.cursor()
-
         # Check table exists
-        cursor.execute("SHOW TABLES LIKE %s", (table_name,))
-        if not cursor.fetchone():
+        table = get_table(table_name)
+        if table is None:
             return jsonify({
                 "status": "error",
                 "message": f"Table '{table_name}' does not exist"
             }), 400
 
-        # Check row exists
-        cursor.execute(f"SELECT * FROM {table_name} WHERE id=%s", (id,))
-        if not cursor.fetchone():
+        unknown = table.unknown_columns(data.keys())
+        if unknown:
             return jsonify({
                 "status": "error",
-                "message": f"No record found with id {id}"
-            }), 404
+                "message": f"Unknown column(s): {unknown}"
+            }), 400
+
+        conn = get_connection()
+        cursor = conn.cursor()
 
         # Build dynamic update query
         columns = []
         values = []
 
         for key, value in data.items():
-            columns.append(f"{key}=%s")
+            columns.append(f"`{key}`=%s")
             values.append(value)
 
         values.append(id)
 
-        sql = f"UPDATE {table_name} SET {', '.join(columns)} WHERE id=%s"
+        sql = f"UPDATE `{table_name}` SET {', '.join(columns)} WHERE id=%s"
 
         cursor.execute(sql, tuple(values))
         conn.commit()
+        bump_version(table_name)
+
+        # Rows matched (FOUND_ROWS), so 0 means the id does not exist
+        if cursor.rowcount == 0:
+            return jsonify({
+                "status": "error",
+                "message": f"No record found with id {id}"
+            }), 404
 
         return jsonify({
             "status": "success",
@@ -158,20 +435,305 @@ def update_data(table_name, id):
     finally:
         if conn:
             conn.close()
+# ------------------ CHUNKED FULL-TABLE DELETE ------------------
+_delete_config = load_config()
+DELETE_BATCH_SIZE = _delete_config.getint('delete', 'batch_size', fallback=5000)
+DELETE_PAUSE_MS = _delete_config.getint('delete', 'pause_ms', fallback=100)
+DELETE_STATE_FILE = _delete_config.get('delete', 'state_file', fallback=DEFAULT_STATE_FILE)
+DELETE_MAX_BATCH_SIZE = 100000
+MAX_FINISHED_DELETE_JOBS = 100
+
+delete_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="delete-job")
+delete_jobs = {}
+_delete_jobs_lock = threading.Lock()
+_delete_state = None
+
+
+def get_delete_state():
+    global _delete_state
+    with _delete_jobs_lock:
+        if _delete_state is None:
+            _delete_state = DeleteState(DELETE_STATE_FILE)
+        return _delete_state
+
+
+class DeleteJob:
+    """One chunked delete of a whole table; counters are read by GET /delete_jobs/<id>"""
+
+    def __init__(self, table_name, batch_size, pause_ms):
+        self.id = uuid.uuid4().hex
+        self.table_name = table_name
+        self.batch_size = batch_size
+        self.pause_ms = pause_ms
+        self.cancel = threading.Event()
+        self.status = "queued"
+        self.rows_deleted = 0
+        self.batches = 0
+        self.last_key = None
+        self.resumed = False
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        end = self.finished_at or time.monotonic()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        return {
+            "job_id": self.id,
+            "table": self.table_name,
+            "status": self.status,
+            "rows_deleted": self.rows_deleted,
+            "batches": self.batches,
+            "last_key": None if self.last_key is None else str(self.last_key),
+            "resumed": self.resumed,
+            "rows_per_sec": round(self.rows_deleted / elapsed, 1) if elapsed > 0 else None,
+            "elapsed_seconds": round(elapsed, 3),
+            "error": self.error,
+        }
+
+
+def is_referenced(cursor, table_name):
+    """True when a foreign key in another table points at this one (TRUNCATE would fail)"""
+    cursor.execute("""
+        SELECT COUNT(*)
+        FROM information_schema.key_column_usage
+        WHERE referenced_table_schema = DATABASE()
+          AND referenced_table_name = %s
+          AND table_name <> %s
+    """, (table_name, table_name))
+    (count,) = cursor.fetchone()
+    return count > 0
+
+
+def delete_in_chunks(job):
+    """DELETE in primary-key ranges of batch_size rows, each its own short transaction, checkpointed after each"""
+    table = get_table(job.table_name)
+    if table is None:
+        raise ValueError(f"Table '{job.table_name}' does not exist")
+
+    state = get_delete_state()
+    pk = table.primary_key
+    name = job.table_name
+
+    conn = get_connection()
+    cursor = conn.cursor(buffered=True)
+
+    # Key ranges only move forward, so the run ends with plain DELETE ... LIMIT batches until one
+    # comes back short; that also catches rows written below a resumed checkpoint (UUID / varchar keys)
+    sweep = len(pk) != 1
+
+    try:
+        while not job.cancel.is_set():
+            if not sweep:
+                # Find the upper key of the next batch on the PK index, then delete that key range
+                key = pk[0]
+                where = f" WHERE `{key}` > %s" if job.last_key is not None else ""
+                params = (job.last_key,) if job.last_key is not None else ()
+
+                cursor.execute(
+                    f"SELECT `{key}` FROM `{name}`{where} ORDER BY `{key}` LIMIT 1 OFFSET %s",
+                    params + (job.batch_size - 1,)
+                )
+                row = cursor.fetchone()
+
+                if row is None:
+                    # Fewer than batch_size rows left above the checkpoint: delete them, then sweep
+                    cursor.execute(f"DELETE FROM `{name}`{where}", params)
+                    sweep = True
+                else:
+                    bound = row[0]
+                    range_sql = f"{where} AND `{key}` <= %s" if where else f" WHERE `{key}` <= %s"
+                    cursor.execute(f"DELETE FROM `{name}`{range_sql}", params + (bound,))
+                    job.last_key = bound
+                done = False
+            else:
+                # Composite or missing primary key, or the final sweep: no key range, just LIMIT
+                order = f" ORDER BY {', '.join(f'`{c}`' for c in pk)}" if pk else ""
+                cursor.execute(f"DELETE FROM `{name}`{order} LIMIT %s", (job.batch_size,))
+                done = cursor.rowcount < job.batch_size
+
+            job.rows_deleted += cursor.rowcount
+            job.batches += 1
+            bump_version(name)
+
+            if done:
+                state.clear(name)
+                return
+
+            state.save(name, job.last_key, job.rows_deleted)
+
+            # Give replication and purge a chance to catch up
+            if job.pause_ms:
+                time.sleep(job.pause_ms / 1000)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def run_delete_job(job):
+    try:
+        if job.cancel.is_set():
+            job.status = "cancelled"
+            return
+
+        job.status = "running"
+        job.started_at = time.monotonic()
+        delete_in_chunks(job)
+        job.status = "cancelled" if job.cancel.is_set() else "done"
+
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+    finally:
+        job.finished_at = time.monotonic()
+
+
+def start_delete_job(table_name, batch_size, pause_ms, resume):
+    """Register a job for the table, picking up its checkpoint; None if a delete is already running there"""
+    with _delete_jobs_lock:
+        for other in delete_jobs.values():
+            if other.table_name == table_name and other.finished_at is None:
+                return None
+
+        finished = [j for j in delete_jobs.values() if j.finished_at]
+        for old in sorted(finished, key=lambda j: j.finished_at)[:max(len(finished) - MAX_FINISHED_DELETE_JOBS, 0)]:
+            del delete_jobs[old.id]
+
+        job = DeleteJob(table_name, batch_size, pause_ms)
+        delete_jobs[job.id] = job
+
+    state = get_delete_state()
+    saved = state.load(table_name)
+    if saved and resume:
+        job.last_key = saved["last_key"]
+        job.rows_deleted = saved["rows_deleted"]
+        job.resumed = True
+    elif saved:
+        state.clear(table_name)
+
+    return job
+
+
+def delete_full_table(table_name):
+    """mode=chunked (default) deletes in PK batches; mode=truncate is the opt-in fast path"""
+    mode = request.args.get("mode", "chunked")
+
+    if mode == "truncate":
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            if is_referenced(cursor, table_name):
+                return jsonify({
+                    "status": "error",
+                    "message": f"Table {table_name} is referenced by a foreign key, use mode=chunked"
+                }), 409
+
+            cursor.execute(f"TRUNCATE TABLE `{table_name}`")
+            bump_version(table_name)
+            get_delete_state().clear(table_name)
+
+            return jsonify({
+                "status": "success",
+                "message": f"All records deleted from table {table_name}",
+                "mode": "truncate"
+            }), 200
+        finally:
+            cursor.close()
+            conn.close()
+
+    if mode != "chunked":
+        return jsonify({
+            "status": "error",
+            "message": "mode must be chunked or truncate"
+        }), 400
+
+    batch_size = request.args.get("batch_size", DELETE_BATCH_SIZE, type=int)
+    pause_ms = request.args.get("pause_ms", DELETE_PAUSE_MS, type=int)
+    resume = request.args.get("resume", "1").lower() in ("1", "true", "yes")
+    background = request.args.get("background", "0").lower() in ("1", "true", "yes")
+
+    if not 0 < batch_size <= DELETE_MAX_BATCH_SIZE or pause_ms < 0:
+        return jsonify({
+            "status": "error",
+            "message": f"batch_size must be between 1 and {DELETE_MAX_BATCH_SIZE}, pause_ms >= 0"
+        }), 400
+
+    job = start_delete_job(table_name, batch_size, pause_ms, resume)
+    if job is None:
+        return jsonify({
+            "status": "error",
+            "message": f"A delete is already running on table {table_name}"
+        }), 409
+
+    if background:
+        delete_pool.submit(run_delete_job, job)
+        return jsonify({
+            "status": "queued",
+            "job_id": job.id,
+            "status_url": f"/delete_jobs/{job.id}"
+        }), 202
+
+    run_delete_job(job)
+    if job.status == "failed":
+        return jsonify({
+            "status": "error",
+            "message": "Delete operation failed, run it again to resume",
+            "error": job.error,
+            "job": job.to_dict()
+        }), 500
+
+    return jsonify({
+        "status": "success",
+        "message": f"All records deleted from table {table_name}",
+        "mode": "chunked",
+        "job": job.to_dict()
+    }), 200
+
+
+#http://127.0.0.1:5000/delete_jobs/<job_id> for progress, DELETE the same url to stop (resumable later)
+def find_delete_job(job_id):
+    with _delete_jobs_lock:
+        return delete_jobs.get(job_id)
+
+
+@app.route("/delete_jobs/<job_id>", methods=["GET"])
+def delete_job_status(job_id):
+    job = find_delete_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": f"Job '{job_id}' not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@app.route("/delete_jobs/<job_id>", methods=["DELETE"])
+def cancel_delete_job(job_id):
+    job = find_delete_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": f"Job '{job_id}' not found"}), 404
+    if job.finished_at:
+        return jsonify({"status": "error", "message": f"Job '{job_id}' already {job.status}"}), 409
+
+    # Stops after the current batch; the checkpoint stays for the next run
+    job.cancel.set()
+    if job.status == "running":
+        job.status = "cancelling"
+    return jsonify(job.to_dict()), 200
+
+
 # ------------------ DELETE ------------------
-#http://127.0.0.1:5000/delete/uuuuuuuuuuuuu to delete full table
+#http://127.0.0.1:5000/delete/uuuuuuuuuuuuu to delete full table in chunks
+#http://127.0.0.1:5000/delete/uuuuuuuuuuuuu?batch_size=5000&pause_ms=100&background=1 returns a job id
+#http://127.0.0.1:5000/delete/uuuuuuuuuuuuu?mode=truncate when no foreign key points at the table
 #http://127.0.0.1:5000/delete/uusers/1 to delete specific id
 @app.route("/delete/<table_name>", methods=["DELETE"])
 @app.route("/delete/<table_name>/<int:id>", methods=["DELETE"])
 def delete_data(table_name, id=None):
 
-    conn = get_connection()
-    cursor = conn.cursor()
+    # Only the single-row case uses a connection here; the full-table paths take their own
+    conn = None
 
     try:
         # Check table exists
-        cursor.execute("SHOW TABLES LIKE %s", (table_name,))
-        if not cursor.fetchone():
+        if get_table(table_name) is None:
             return jsonify({
                 "status": "error",
                 "message": f"Table '{table_name}' does not exist"
@@ -180,32 +742,342 @@ def delete_data(table_name, id=None):
         # ✅ CASE 1 — delete only ONE row
         if id is not None:
 
-            cursor.execute(f"SELECT * FROM {table_name} WHERE id=%s", (id,))
-            row = cursor.fetchone()
+            conn = get_connection()
+            cursor = conn.cursor()
+            cursor.execute(f"DELETE FROM `{table_name}` WHERE id=%s", (id,))
+            conn.commit()
+            bump_version(table_name)
 
-            if not row:
+            if cursor.rowcount == 0:
                 return jsonify({
                     "status": "error",
                     "message": f"ID {id} not found"
                 }), 404
 
-            cursor.execute(f"DELETE FROM {table_name} WHERE id=%s", (id,))
-            conn.commit()
-
             return jsonify({
                 "status": "success",
                 "message": f"Deleted ID {id} from {table_name}"
             }), 200
 
-        # ✅ CASE 2 — delete FULL table
+        # ✅ CASE 2 — delete FULL table, in PK-ordered chunks (or TRUNCATE when asked)
+        else:
+            return delete_full_table(table_name)
+
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        return jsonify({
+            "status": "error",
+            "message": "Delete operation failed",
+            "error": str(e)
+        }), 500
+
+    finally:
+        if conn:
+            conn.close()
+# ------------------ BATCH ADD / UPDATE / DELETE ------------------
+BATCH_SIZE = 1000           # rows per statement / transaction
+BATCH_MAX_SIZE = 5000
+BATCH_MAX_ITEMS = 100000    # biggest request body a sync job may send
+
+
+def read_batch_payload(key):
+    """Body is either a JSON array or {key: [...], "batch_size": n, ...}; returns (items, options)"""
+    payload = request.get_json(silent=True)
+    if isinstance(payload, list):
+        return payload, {}
+    if isinstance(payload, dict) and isinstance(payload.get(key), list):
+        return payload[key], payload
+    return None, {}
+
+
+def check_batch_request(table_name, items, options):
+    """(table, batch_size, error_response) -- error_response is None when the request is usable"""
+    if not items:
+        return None, None, (jsonify({"status": "error", "message": "No items provided"}), 400)
+
+    if len(items) > BATCH_MAX_ITEMS:
+        return None, None, (jsonify({
+            "status": "error",
+            "message": f"At most {BATCH_MAX_ITEMS} items per request"
+        }), 400)
+
+    table = get_table(table_name)
+    if table is None:
+        return None, None, (jsonify({
+            "status": "error",
+            "message": f"Table '{table_name}' does not exist"
+        }), 400)
+
+    batch_size = options.get("batch_size", BATCH_SIZE)
+    if not isinstance(batch_size, int) or not 0 < batch_size <= BATCH_MAX_SIZE:
+        return None, None, (jsonify({
+            "status": "error",
+            "message": f"batch_size must be between 1 and {BATCH_MAX_SIZE}"
+        }), 400)
+
+    return table, batch_size, None
+
+
+def validate_rows(table, rows, results, need_id=False):
+    """Drop rows that cannot be sent (not an object, unknown columns, missing id); returns [(index, row)]"""
+    valid = []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict) or not row:
+            results[index] = {"index": index, "status": "error", "message": "Row must be a non-empty object"}
+            continue
+        unknown = table.unknown_columns(row.keys())
+        if unknown:
+            results[index] = {"index": index, "status": "error", "message": f"Unknown column(s): {unknown}"}
+            continue
+        if need_id and (row.get("id") is None or len(row) < 2):
+            results[index] = {"index": index, "status": "error", "message": "Row needs an id and at least one column"}
+            continue
+        valid.append((index, row))
+    return valid
+
+
+def group_by_columns(indexed_rows, batch_size):
+    """Rows with the same column set share one statement; yields (columns, [(index, row)]) batches"""
+    groups = {}
+    for index, row in indexed_rows:
+        groups.setdefault(tuple(row.keys()), []).append((index, row))
+
+    for columns, members in groups.items():
+        for start in range(0, len(members), batch_size):
+            yield list(columns), members[start:start + batch_size]
+
+
+def batch_response(table_name, results):
+    summary = {}
+    for item in results:
+        summary[item["status"]] = summary.get(item["status"], 0) + 1
+
+    failed = summary.get("error", 0) + summary.get("not_found", 0)
+    return jsonify({
+        "status": "success" if not failed else ("error" if failed == len(results) else "partial"),
+        "table": table_name,
+        "summary": summary,
+        "results": results
+    }), 200
+
+
+#http://127.0.0.1:5000/add_batch/uusers raw json [{"name": "a"}, {"name": "b"}]
+#or {"rows": [...], "upsert": true, "batch_size": 1000} -- upsert updates rows whose key already exists
+@app.route("/add_batch/<table_name>", methods=["POST"])
+def add_batch(table_name):
+
+    rows, options = read_batch_payload("rows")
+    table, batch_size, error = check_batch_request(table_name, rows, options)
+    if error:
+        return error
+
+    upsert = bool(options.get("upsert"))
+    done_status = "upserted" if upsert else "inserted"
+    results = [None] * len(rows)
+    valid = validate_rows(table, rows, results)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        for columns, batch in group_by_columns(valid, batch_size):
+            col_sql = ", ".join(f"`{c}`" for c in columns)
+            placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+            sql = f"INSERT INTO `{table_name}` ({col_sql}) VALUES "
+            suffix = ""
+            if upsert:
+                suffix = " ON DUPLICATE KEY UPDATE " + ", ".join(f"`{c}`=VALUES(`{c}`)" for c in columns)
+
+            # One multi-row INSERT per batch, in its own transaction
+            conn.start_transaction()
+            try:
+                cursor.execute(
+                    sql + ", ".join([placeholders] * len(batch)) + suffix,
+                    tuple(value for _, row in batch for value in row.values())
+                )
+                conn.commit()
+                for index, _ in batch:
+                    results[index] = {"index": index, "status": done_status}
+                continue
+            except Exception:
+                conn.rollback()
+
+            # Batch failed: replay it row by row so only the bad rows are reported
+            conn.start_transaction()
+            for index, row in batch:
+                try:
+                    cursor.execute(sql + placeholders + suffix, tuple(row.values()))
+                    results[index] = {"index": index, "status": done_status}
+                except Exception as e:
+                    results[index] = {"index": index, "status": "error", "message": str(e)}
+            conn.commit()
+
+        return batch_response(table_name, results)
+
+    except Exception as e:
+        conn.rollback()
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+    finally:
+        # Even a failed batch request may have committed earlier batches
+        bump_version(table_name)
+        conn.close()
+
+
+def id_key(value):
+    # "7" and 7 are the same INT id, and default collations ignore case
+    return str(value).casefold()
+
+
+def update_rows(cursor, table_name, columns, set_cols, batch):
+    """Multi-row UPDATE of one batch; returns the indexes of the rows whose id exists.
+
+    ON DUPLICATE KEY UPDATE would need every NOT NULL column of the table and would insert rows
+    deleted meanwhile, so the new values are joined in as a UNION ALL derived table instead.
+    """
+    ids = [row["id"] for _, row in batch]
+    if len({id_key(id) for id in ids}) < len(ids):
+        # Two new values for one row: the JOIN would apply just one of them
+        raise ValueError("Duplicate ids in batch")
+
+    # Locks the rows, so none of them disappears before the UPDATE
+    cursor.execute(
+        f"SELECT id FROM `{table_name}` WHERE id IN ({', '.join(['%s'] * len(ids))}) FOR UPDATE",
+        tuple(ids)
+    )
+    found = {id_key(row[0]) for row in cursor.fetchall()}
+    existing = [(index, row) for index, row in batch if id_key(row["id"]) in found]
+
+    if existing:
+        first = "SELECT " + ", ".join(f"%s AS `{c}`" for c in columns)
+        rest = " UNION ALL SELECT " + ", ".join(["%s"] * len(columns))
+        cursor.execute(
+            f"UPDATE `{table_name}` AS target JOIN ({first}{rest * (len(existing) - 1)}) AS incoming "
+            f"ON target.id = incoming.id SET {', '.join(f'target.`{c}` = incoming.`{c}`' for c in set_cols)}",
+            tuple(row[c] for _, row in existing for c in columns)
+        )
+
+    return {index for index, _ in existing}
+
+
+#http://127.0.0.1:5000/update_batch/uusers raw json [{"id": 1, "name": "a"}, {"id": 2, "city": "b"}]
+@app.route("/update_batch/<table_name>", methods=["POST"])
+def update_batch(table_name):
+
+    rows, options = read_batch_payload("rows")
+    table, batch_size, error = check_batch_request(table_name, rows, options)
+    if error:
+        return error
+
+    results = [None] * len(rows)
+    valid = validate_rows(table, rows, results, need_id=True)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        for columns, batch in group_by_columns(valid, batch_size):
+            set_cols = [c for c in columns if c != "id"]
+            sql = f"UPDATE `{table_name}` SET {', '.join(f'`{c}`=%s' for c in set_cols)} WHERE id=%s"
+
+            # One existence SELECT and one multi-row UPDATE ... JOIN per batch, in one transaction
+            conn.start_transaction()
+            try:
+                updated = update_rows(cursor, table_name, columns, set_cols, batch)
+                conn.commit()
+                for index, row in batch:
+                    status = "updated" if index in updated else "not_found"
+                    results[index] = {"index": index, "id": row["id"], "status": status}
+                continue
+            except Exception:
+                conn.rollback()
+
+            # Batch failed: replay it row by row so only the bad rows are reported
+            conn.start_transaction()
+            for index, row in batch:
+                try:
+                    cursor.execute(sql, tuple(row[c] for c in set_cols) + (row["id"],))
+                    if cursor.rowcount:
+                        results[index] = {"index": index, "id": row["id"], "status": "updated"}
+                    else:
+                        results[index] = {"index": index, "id": row["id"], "status": "not_found"}
+                except Exception as e:
+                    results[index] = {"index": index, "id": row["id"], "status": "error", "message": str(e)}
+            conn.commit()
+
+        return batch_response(table_name, results)
+
+    except Exception as e:
+        conn.rollback()
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+    finally:
+        # Even a failed batch request may have committed earlier batches
+        bump_version(table_name)
+        conn.close()
+
+
+#http://127.0.0.1:5000/delete_batch/uusers raw json [1, 2, 3] or {"ids": [1, 2, 3], "batch_size": 1000}
+@app.route("/delete_batch/<table_name>", methods=["DELETE", "POST"])
+def delete_batch(table_name):
+
+    ids, options = read_batch_payload("ids")
+    table, batch_size, error = check_batch_request(table_name, ids, options)
+    if error:
+        return error
+
+    results = [None] * len(ids)
+    valid = []
+    for index, id in enumerate(ids):
+        if isinstance(id, (int, str)) and not isinstance(id, bool):
+            valid.append((index, id))
         else:
-            cursor.execute(f"DELETE FROM {table_name}")
+            results[index] = {"index": index, "id": id, "status": "error", "message": "id must be a number or string"}
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    try:
+        for start in range(0, len(valid), batch_size):
+            batch = valid[start:start + batch_size]
+            unique_ids = list(dict.fromkeys(id for _, id in batch))
+
+            # Fast path: one DELETE ... IN (...) per batch, all ids found
+            conn.start_transaction()
+            cursor.execute(
+                f"DELETE FROM `{table_name}` WHERE id IN ({', '.join(['%s'] * len(unique_ids))})",
+                tuple(unique_ids)
+            )
+            if cursor.rowcount == len(unique_ids):
+                conn.commit()
+                for index, id in batch:
+                    results[index] = {"index": index, "id": id, "status": "deleted"}
+                continue
+
+            # Some ids were missing: undo and delete one by one to tell which
+            conn.rollback()
+            conn.start_transaction()
+            deleted = set()
+            for index, id in batch:
+                if id in deleted:
+                    results[index] = {"index": index, "id": id, "status": "deleted"}
+                    continue
+                cursor.execute(f"DELETE FROM `{table_name}` WHERE id=%s", (id,))
+                if cursor.rowcount:
+                    deleted.add(id)
+                    results[index] = {"index": index, "id": id, "status": "deleted"}
+                else:
+                    results[index] = {"index": index, "id": id, "status": "not_found"}
             conn.commit()
 
-            return jsonify({
-                "status": "success",
-                "message": f"All records deleted from table {table_name}"
-            }), 200
+        return batch_response(table_name, results)
 
     except Exception as e:
         conn.rollback()
@@ -216,6 +1088,8 @@ def delete_data(table_name, id=None):
         }), 500
 
     finally:
+        # Even a failed batch request may have committed earlier batches
+        bump_version(table_name)
         conn.close()
 #--------create table route--------
 #http://127.0.0.1:5000/create_table to create table in row postman add in raw json
@@ -263,6 +1137,9 @@ def create_table():
         cursor.execute(sql)
         conn.commit()
 
+        # New table must be visible to the other routes straight away
+        invalidate_schema()
+
         return f"Table '{table_name}' created successfully!"
 
     except Exception as e:
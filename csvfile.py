@@ -1,9 +1,20 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Request
 import pandas as pd
 import io
-from db_connector import get_connection
+import os
+import time
+import tempfile
+import mysql.connector
+from db_connector import get_connection, get_pool
+from schema_catalog import get_table
 import logging
 import asyncio
+import queue
+import shutil
+import itertools
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 # ---------------------------
 # Logging setup
@@ -17,101 +28,599 @@ app = FastAPI(title="CSV/Excel Upload API")
 
 
 # ---------------------------
-# Check if table exists
+# Worker pools
 # ---------------------------
-def check_table_exists(cursor, table_name: str):
-    cursor.execute(f"SHOW TABLES LIKE '{table_name}'")
-    result = cursor.fetchone()
-    if not result:
-        logging.error(f"Table '{table_name}' does NOT exist.")
-        raise HTTPException(status_code=400, detail=f"Table '{table_name}' does NOT exist.")
-    logging.info(f"Table '{table_name}' exists.")
+# The mysql driver and pandas are blocking, so uploads run here instead of on the event loop.
+WRITE_WORKERS = 6           # threads holding a DB connection and inserting
+JOB_WORKERS = 4             # background upload jobs; WRITE_WORKERS + JOB_WORKERS <= pool max_size
+# A producer holds its parse thread for the whole upload (backpressure), so one per possible upload
+PARSE_WORKERS = WRITE_WORKERS + JOB_WORKERS
+TABLE_CONCURRENCY = 2       # concurrent uploads allowed into the same table
+QUEUE_DEPTH = 4             # parsed batches waiting for the writer before the parser pauses
+
+parse_pool = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="upload-parse")
+write_pool = ThreadPoolExecutor(max_workers=WRITE_WORKERS, thread_name_prefix="upload-write")
+job_pool = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="upload-job")
+
+# Taken on the event loop before a pool thread is used, so uploads queued behind a busy
+# table don't hold writer / job threads that uploads to other tables could use
+_table_slots = {}
+
+
+async def acquire_table_slot(table_name: str, cancelled):
+    """Wait for one of the table's TABLE_CONCURRENCY slots; None if cancelled() while waiting"""
+    slot = _table_slots.setdefault(table_name, asyncio.Semaphore(TABLE_CONCURRENCY))
+    acquire = asyncio.ensure_future(slot.acquire())
+    while True:
+        done, _ = await asyncio.wait([acquire], timeout=0.5)
+        if done:
+            return slot
+        if await cancelled():
+            acquire.cancel()
+            try:
+                await acquire
+            except asyncio.CancelledError:
+                return None
+            slot.release()      # the slot came free just before the cancel
+            return None
+
+
+class UploadCancelled(Exception):
+    pass
+
+
+class UploadProgress:
+    """Counters shared by the parser, the writer and anyone watching the upload"""
+
+    def __init__(self):
+        self.cancel = threading.Event()
+        self.rows_parsed = 0
+        self.rows_inserted = 0
+        self.bytes_parsed = 0
+        self.bytes_total = None
+        self.started_at = None
 
 
 # ---------------------------
-# Get table columns
+# Check table exists / get table columns (cached schema metadata)
 # ---------------------------
-def get_table_columns(cursor, table_name: str):
-    cursor.execute(f"DESCRIBE {table_name}")
-    columns = [row[0] for row in cursor.fetchall()]
+def get_table_columns(table_name: str):
+    table = get_table(table_name)
+    if table is None:
+        logging.error(f"Table '{table_name}' does NOT exist.")
+        raise HTTPException(status_code=400, detail=f"Table '{table_name}' does NOT exist.")
+    columns = table.column_names
     logging.info(f"Table '{table_name}' columns: {columns}")
     return columns
 
 
 # ---------------------------
-# Upload API with CANCEL SUPPORT
+# Bulk insert helpers
 # ---------------------------
-@app.post("/upload/{table_name}")
-async def upload_file(table_name: str, request: Request, file: UploadFile = File(...)):
-    try:
-        file_bytes = await file.read()
-        logging.info(f"Received file: {file.filename} ({len(file_bytes)} bytes)")
+DEFAULT_BATCH_SIZE = 5000
 
-        if file.filename.endswith(".csv"):
-            df = pd.read_csv(io.BytesIO(file_bytes))
-        elif file.filename.endswith((".xlsx", ".xls")):
-            df = pd.read_excel(io.BytesIO(file_bytes))
-        else:
-            raise HTTPException(status_code=400, detail="Only CSV, XLS, XLSX files are allowed.")
 
-        logging.info(f"Loaded DataFrame with shape: {df.shape}")
+def build_insert_query(table_name: str, table_cols):
+    # executemany() rewrites this into one multi-row INSERT per batch
+    return f"""
+        INSERT INTO `{table_name}` ({', '.join(f'`{c}`' for c in table_cols)})
+        VALUES ({', '.join(['%s'] * len(table_cols))})
+    """
 
-        df = df.where(pd.notnull(df), None)
 
-        conn = get_connection()
-        cursor = conn.cursor()
+def dataframe_rows(df, table_cols):
+    # object dtype turns numpy scalars into plain Python values the driver understands
+    df = df[table_cols].astype(object)
+    df = df.where(pd.notnull(df), None)
+    return list(df.itertuples(index=False, name=None))
+
 
-        check_table_exists(cursor, table_name)
-        table_cols = get_table_columns(cursor, table_name)
+def iter_batches(frames, table_cols, batch_size, progress):
+    # parse -> convert -> insert: only one frame is converted at a time
+    for df in frames:
+        progress.rows_parsed += len(df)
+        rows = dataframe_rows(df, table_cols)
+        for start in range(0, len(rows), batch_size):
+            yield rows[start:start + batch_size]
 
-        missing_cols = [col for col in table_cols if col not in df.columns]
-        if missing_cols:
-            logging.error(f"Missing required columns: {missing_cols}")
-            raise HTTPException(status_code=400, detail=f"Missing required column(s): {missing_cols}")
 
-        insert_query = f"""
-            INSERT INTO {table_name} ({', '.join(table_cols)})
-            VALUES ({', '.join(['%s'] * len(table_cols))})
-        """
+def queued_batches(frames, table_cols, batch_size, progress):
+    """Parse on the parse pool and hand batches over a bounded queue (backpressure on the parser)"""
+    batches = queue.Queue(maxsize=QUEUE_DEPTH)
+    cancel = progress.cancel
+    stop = threading.Event()
+    done = object()
 
-        row_count = 0
+    def put(item):
+        while not (stop.is_set() or cancel.is_set()):
+            try:
+                batches.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
 
+    def produce():
         try:
-            for idx, row in df.iterrows():
+            for batch in iter_batches(frames, table_cols, batch_size, progress):
+                if not put(batch):
+                    return
+            put(done)
+        except Exception as e:
+            put(e)
 
-                # 🔥 Check if Postman/Client disconnected
-                if await request.is_disconnected():
-                    logging.warning("Client disconnected! Stopping insertion and rolling back.")
-                    conn.rollback()
-                    raise HTTPException(status_code=499, detail="Client cancelled the request")
+    parse_pool.submit(produce)
 
-                values = [None if pd.isna(row.get(col, None)) else row.get(col, None)
-                          for col in table_cols]
+    try:
+        while True:
+            try:
+                item = batches.get(timeout=0.5)
+            except queue.Empty:
+                if cancel.is_set():
+                    return
+                continue
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
 
-                cursor.execute(insert_query, tuple(values))
-                row_count += 1
 
-                logging.info(f"Inserted row {idx+1}")
+def insert_batches(conn, cursor, insert_query, batches, commit_per_batch, progress):
+    """Insert each batch with executemany; returns rows inserted and batches run"""
+    cancel = progress.cancel
+    row_count = 0
+    batch_count = 0
 
-                await asyncio.sleep(0)  # allow cancellation
+    if not commit_per_batch:
+        conn.start_transaction()
 
-            conn.commit()
-            logging.info(f"Inserted {row_count} rows successfully.")
+    for batch in batches:
 
-        except Exception as e:
+        # 🔥 Check if Postman/Client disconnected (once per batch)
+        if cancel.is_set():
+            logging.warning("Client disconnected! Stopping insertion and rolling back.")
+            conn.rollback()
+            raise UploadCancelled()
+
+        if commit_per_batch:
+            conn.start_transaction()
+        try:
+            cursor.executemany(insert_query, batch)
+            if commit_per_batch:
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            logging.error(f"Batch {batch_count + 1} failed after {row_count} committed rows")
+            raise
+
+        row_count += len(batch)
+        batch_count += 1
+        progress.rows_inserted = row_count
+        logging.info(f"Inserted batch {batch_count} ({row_count} rows so far)")
+
+    if cancel.is_set():
+        conn.rollback()
+        raise UploadCancelled()
+
+    if not commit_per_batch:
+        conn.commit()
+
+    return row_count, batch_count
+
+
+def escape_backslashes(df):
+    r"""LOAD DATA treats a backslash as an escape (\t, \n, \0, \N ...); to_csv doesn't, so double them first"""
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object or pd.api.types.is_string_dtype(df[col]):
+            df[col] = df[col].map(lambda v: v.replace("\\", "\\\\") if isinstance(v, str) else v)
+    return df
+
+
+def load_data_infile(table_name: str, table_cols, frames, progress):
+    """Fast path: write the frames to a temp CSV and let MySQL bulk-load it with LOAD DATA LOCAL INFILE"""
+    tmp = tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False, newline="", encoding="utf-8")
+    try:
+        for df in frames:
+            if progress.cancel.is_set():
+                raise UploadCancelled()
+            # Real NULLs become the \N marker; a literal "\N" value was escaped to "\\N" above
+            escape_backslashes(df[table_cols]).to_csv(
+                tmp, index=False, header=False, na_rep="\\N", lineterminator="\n"
+            )
+            progress.rows_parsed += len(df)
+        tmp.close()
+
+        # Last chance to stop before anything reaches the table
+        if progress.cancel.is_set():
+            raise UploadCancelled()
+
+        # LOCAL INFILE has to be enabled per connection, so this one is not taken from the pool
+        conn = mysql.connector.connect(**get_pool().connect_args, allow_local_infile=True)
+        cursor = conn.cursor()
+        try:
+            conn.start_transaction()
+            cursor.execute(f"""
+                LOAD DATA LOCAL INFILE %s
+                INTO TABLE `{table_name}`
+                CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+                LINES TERMINATED BY '\\n'
+                ({', '.join(f'`{c}`' for c in table_cols)})
+            """, (tmp.name.replace("\\", "/"),))
+            row_count = cursor.rowcount
+            conn.commit()
+        except Exception:
             conn.rollback()
-            logging.error("Failed to insert data: " + str(e))
-            raise e
+            raise
         finally:
             cursor.close()
             conn.close()
+    finally:
+        os.remove(tmp.name)
+
+    return row_count
+
+
+# ---------------------------
+# Upload readers
+# ---------------------------
+DEFAULT_CHUNK_SIZE = 50000
+
+
+def validate_columns(columns, table_cols):
+    missing_cols = [col for col in table_cols if col not in columns]
+    if missing_cols:
+        logging.error(f"Missing required columns: {missing_cols}")
+        raise HTTPException(status_code=400, detail=f"Missing required column(s): {missing_cols}")
+
+
+def read_upload_whole(file_bytes, filename):
+    if filename.endswith(".csv"):
+        return pd.read_csv(io.BytesIO(file_bytes))
+    return pd.read_excel(io.BytesIO(file_bytes))
 
-        return {"status": "success", "rows_inserted": row_count}
 
+def iter_excel_chunks(fileobj, chunk_size):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        yield header
+
+        buffer = []
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame(buffer, columns=header)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=header)
+    finally:
+        workbook.close()
+
+
+def track_position(frames, fileobj, progress):
+    for df in frames:
+        progress.bytes_parsed = fileobj.tell()
+        yield df
+
+
+def open_upload_stream(fileobj, filename: str, chunk_size: int, progress):
+    """Return (header, frames) reading the spooled upload chunk by chunk instead of all at once"""
+    fileobj.seek(0)
+
+    if filename.endswith(".csv"):
+        header = list(pd.read_csv(fileobj, nrows=0).columns)
+        fileobj.seek(0)
+        return header, track_position(pd.read_csv(fileobj, chunksize=chunk_size), fileobj, progress)
+
+    if filename.endswith(".xlsx"):
+        chunks = iter_excel_chunks(fileobj, chunk_size)
+        return next(chunks), chunks
+
+    # .xls has no row-streaming reader, fall back to one frame
+    df = pd.read_excel(fileobj)
+    return list(df.columns), [df]
+
+
+def open_upload(fileobj, filename: str, stream: bool, chunk_size: int, progress):
+    fileobj.seek(0, os.SEEK_END)
+    progress.bytes_total = fileobj.tell()
+    fileobj.seek(0)
+
+    if stream:
+        # Starlette already spooled the body to disk; parse it in chunks from there
+        logging.info(f"Streaming file: {filename} in chunks of {chunk_size} rows")
+        return open_upload_stream(fileobj, filename, chunk_size, progress)
+
+    file_bytes = fileobj.read()
+    logging.info(f"Received file: {filename} ({len(file_bytes)} bytes)")
+    df = read_upload_whole(file_bytes, filename)
+    logging.info(f"Loaded DataFrame with shape: {df.shape}")
+    progress.bytes_parsed = progress.bytes_total
+    return list(df.columns), [df]
+
+
+# ---------------------------
+# Upload pipeline (runs on write_pool)
+# ---------------------------
+def run_upload(table_name: str, fileobj, filename: str, batch_size: int, commit_per_batch: bool,
+               method: str, stream: bool, chunk_size: int, progress):
+    # The caller holds the table's slot (acquire_table_slot)
+    header, frames = open_upload(fileobj, filename, stream, chunk_size, progress)
+
+    table_cols = get_table_columns(table_name)
+
+    # Header is checked before any data row is parsed or inserted
+    validate_columns(header, table_cols)
+
+    try:
+        started = time.perf_counter()
+        progress.started_at = time.monotonic()
+
+        if method == "load_data":
+            # Uses its own LOCAL INFILE connection, so no pooled one is taken here
+            row_count = load_data_infile(table_name, table_cols, frames, progress)
+            batch_count = 1
+            progress.rows_inserted = row_count
+        else:
+            insert_query = build_insert_query(table_name, table_cols)
+            parsed = queued_batches(frames, table_cols, batch_size, progress)
+
+            # Don't sit on a pooled connection while the first chunk is still being parsed
+            first = next(parsed, None)
+            batches = itertools.chain([first], parsed) if first is not None else parsed
+
+            conn = get_connection()
+            cursor = conn.cursor()
+            try:
+                row_count, batch_count = insert_batches(
+                    conn, cursor, insert_query, batches, commit_per_batch, progress
+                )
+            finally:
+                cursor.close()
+                conn.close()
+                parsed.close()
+
+        elapsed = time.perf_counter() - started
+        logging.info(f"Inserted {row_count} rows successfully in {elapsed:.2f}s.")
+
+    except Exception as e:
+        logging.error("Failed to insert data: " + str(e))
+        raise e
+
+    return {
+        "status": "success",
+        "rows_inserted": row_count,
+        "batches": batch_count,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_sec": round(row_count / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+# ---------------------------
+# Background upload jobs
+# ---------------------------
+MAX_FINISHED_JOBS = 500     # finished jobs kept around for GET /jobs/{id}
+
+jobs = {}
+_jobs_lock = threading.Lock()
+
+
+class UploadJob(UploadProgress):
+    def __init__(self, table_name: str, filename: str, path: str, options: dict):
+        super().__init__()
+        self.id = uuid.uuid4().hex
+        self.table_name = table_name
+        self.filename = filename
+        self.path = path
+        self.options = options
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.finished_at_mono = None
+
+    def to_dict(self):
+        end = self.finished_at_mono if self.finished_at else time.monotonic()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        rate = self.rows_inserted / elapsed if elapsed > 0 else None
+
+        # Total rows are unknown while streaming; extrapolate from how much of the file was parsed
+        estimated_total = None
+        if self.bytes_total and self.bytes_parsed:
+            estimated_total = round(self.rows_parsed * self.bytes_total / self.bytes_parsed)
+
+        eta = None
+        if self.status == "running" and rate and estimated_total:
+            eta = round(max(estimated_total - self.rows_inserted, 0) / rate, 1)
+
+        return {
+            "job_id": self.id,
+            "table": self.table_name,
+            "file": self.filename,
+            "status": self.status,
+            "rows_parsed": self.rows_parsed,
+            "rows_inserted": self.rows_inserted,
+            "estimated_total_rows": estimated_total,
+            "rows_per_sec": round(rate, 1) if rate else None,
+            "elapsed_seconds": round(elapsed, 3),
+            "eta_seconds": eta,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+def run_job(job: UploadJob):
+    try:
+        if job.cancel.is_set():
+            job.status = "cancelled"
+            return
+
+        job.status = "running"
+        with open(job.path, "rb") as fileobj:
+            job.result = run_upload(job.table_name, fileobj, job.filename, progress=job, **job.options)
+        job.status = "done"
+
+    except UploadCancelled:
+        job.status = "cancelled"
+    except HTTPException as e:
+        job.status = "failed"
+        job.error = e.detail
+    except Exception as e:
+        logging.exception(f"Upload job {job.id} failed")
+        job.status = "failed"
+        job.error = str(e)
+    finally:
+        job.finished_at_mono = time.monotonic()
+        job.finished_at = time.time()
+        os.remove(job.path)
+        logging.info(f"Upload job {job.id} finished: {job.status}")
+
+
+_job_tasks = set()     # the loop only keeps weak references to tasks
+
+
+async def run_job_in_slot(job: UploadJob):
+    async def cancelled():
+        return job.cancel.is_set()
+
+    # A cancelled job still goes through run_job, which records it and removes the spooled file
+    slot = await acquire_table_slot(job.table_name, cancelled)
+    try:
+        await asyncio.get_running_loop().run_in_executor(job_pool, run_job, job)
+    finally:
+        if slot is not None:
+            slot.release()
+
+
+def submit_job(job: UploadJob):
+    """Called on the event loop; the job waits there for its table slot, not on a job_pool thread"""
+    with _jobs_lock:
+        finished = [j for j in jobs.values() if j.finished_at]
+        for old in sorted(finished, key=lambda j: j.finished_at)[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del jobs[old.id]
+        jobs[job.id] = job
+    task = asyncio.get_running_loop().create_task(run_job_in_slot(job))
+    _job_tasks.add(task)
+    task.add_done_callback(_job_tasks.discard)
+
+
+def spool_to_disk(fileobj, filename: str):
+    # The request's UploadFile is closed once we answer, so the job gets its own copy
+    suffix = os.path.splitext(filename)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        fileobj.seek(0)
+        shutil.copyfileobj(fileobj, tmp)
+        return tmp.name
+
+
+# ---------------------------
+# Upload API with CANCEL SUPPORT
+# ---------------------------
+#http://127.0.0.1:8000/upload/PROVIDER_TEST_DETAILS?batch_size=10000&commit=batch
+#http://127.0.0.1:8000/upload/PROVIDER_TEST_DETAILS?method=load_data for LOAD DATA LOCAL INFILE
+#http://127.0.0.1:8000/upload/PROVIDER_TEST_DETAILS?stream=true&chunk_size=50000 for multi-GB files
+#http://127.0.0.1:8000/upload/PROVIDER_TEST_DETAILS?background=true returns a job id, see /jobs/{job_id}
+@app.post("/upload/{table_name}")
+async def upload_file(table_name: str, request: Request, file: UploadFile = File(...),
+                      batch_size: int = DEFAULT_BATCH_SIZE, commit: str = "all",
+                      method: str = "insert", stream: bool = False,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE, background: bool = False):
+    try:
+        if batch_size <= 0 or chunk_size <= 0:
+            raise HTTPException(status_code=400, detail="batch_size and chunk_size must be positive.")
+        if commit not in ("all", "batch"):
+            raise HTTPException(status_code=400, detail="commit must be 'all' or 'batch'.")
+        if method not in ("insert", "load_data"):
+            raise HTTPException(status_code=400, detail="method must be 'insert' or 'load_data'.")
+        if not file.filename.endswith((".csv", ".xlsx", ".xls")):
+            raise HTTPException(status_code=400, detail="Only CSV, XLS, XLSX files are allowed.")
+
+        loop = asyncio.get_running_loop()
+
+        if background:
+            path = await loop.run_in_executor(None, spool_to_disk, file.file, file.filename)
+            job = UploadJob(table_name, file.filename, path, {
+                "batch_size": batch_size,
+                "commit_per_batch": commit == "batch",
+                "method": method,
+                "stream": stream,
+                "chunk_size": chunk_size,
+            })
+            submit_job(job)
+            logging.info(f"Queued upload job {job.id} for table '{table_name}'")
+            return {"status": "queued", "job_id": job.id, "status_url": f"/jobs/{job.id}"}
+
+        slot = await acquire_table_slot(table_name, request.is_disconnected)
+        if slot is None:
+            raise HTTPException(status_code=499, detail="Client cancelled the request")
+
+        try:
+            progress = UploadProgress()
+            future = loop.run_in_executor(
+                write_pool, run_upload, table_name, file.file, file.filename, batch_size,
+                commit == "batch", method, stream, chunk_size, progress
+            )
+
+            # The event loop stays free; it only watches for the client going away
+            while not future.done():
+                await asyncio.wait([future], timeout=0.5)
+                if not future.done() and await request.is_disconnected():
+                    progress.cancel.set()
+
+            try:
+                return await future
+            except UploadCancelled:
+                raise HTTPException(status_code=499, detail="Client cancelled the request")
+        finally:
+            slot.release()
+
+    except HTTPException:
+        raise
     except Exception as e:
         logging.exception("Unexpected error occurred")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+# ---------------------------
+# Job status / cancel
+# ---------------------------
+#http://127.0.0.1:8000/jobs/<job_id> for progress, DELETE the same url to cancel
+def get_job(job_id: str):
+    with _jobs_lock:
+        job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    return get_job(job_id).to_dict()
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    job = get_job(job_id)
+
+    if job.finished_at:
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' already {job.status}")
+
+    # The writer rolls back the open transaction before its next batch
+    job.cancel.set()
+    if job.status == "running":
+        job.status = "cancelling"
+    logging.info(f"Cancel requested for upload job {job_id}")
+    return job.to_dict()
+
 # ---------------------------
 # Direct run support
 # ---------------------------
@@ -1,39 +1,358 @@
 import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
 import mysql.connector
+from mysql.connector.constants import ClientFlag
 import configparser
 
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'config', 'config.ini')
+
+# ---------------------------
+# Config (parsed once, cached)
+# ---------------------------
+_config = None
+_config_lock = threading.Lock()
+
+
+def load_config():
+    """Read config/config.ini once and return the cached ConfigParser"""
+    global _config
+
+    if _config is not None:
+        return _config
+
+    with _config_lock:
+        if _config is None:
+            if not os.path.exists(CONFIG_PATH):
+                raise FileNotFoundError(f"Config file not found at {CONFIG_PATH}")
+
+            config = configparser.ConfigParser()
+            config.read(CONFIG_PATH)
+            _config = config
+
+    return _config
+
+
+# ---------------------------
+# Pooled connection wrapper
+# ---------------------------
+class _PoolEntry:
+    """A raw connection parked in the pool, with the timestamps the health check needs"""
+
+    __slots__ = ("raw", "created_at", "last_used")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class PooledConnection:
+    """One checkout of a pooled connection; close() hands it back to the pool instead of closing it.
+
+    Every acquire() returns a new handle, so a stale reference kept after close() can never
+    release (or use) the connection somebody else checked out afterwards.
+    """
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+
+    @property
+    def _raw(self):
+        entry = self.__dict__.get("_entry")
+        if entry is None:
+            raise mysql.connector.errors.PoolError("Connection already returned to the pool")
+        return entry.raw
+
+    def __getattr__(self, name):
+        # cursor(), commit(), rollback(), database, server_host ... go to the real connection
+        return getattr(self._raw, name)
+
+    def __setattr__(self, name, value):
+        # Markers like view_cache's stats_expiry_off describe the session, so they live on it
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._raw, name, value)
+
+    def close(self):
+        entry = self.__dict__.get("_entry")
+        if entry is None:
+            raise mysql.connector.errors.PoolError("Connection already returned to the pool")
+        self._entry = None
+        self._pool.release(entry)
+
+    def __del__(self):
+        # Dropped without close(): give the slot back; the session state is unknown, so the
+        # connection itself is closed, not reused. The pool reaps it on its next acquire().
+        entry = self.__dict__.get("_entry")
+        if entry is not None:
+            self._entry = None
+            self._pool._leaked.append(entry.raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.__dict__.get("_entry") is None:
+            # closed inside the block already
+            return False
+        if exc_type is not None:
+            try:
+                self._raw.rollback()
+            except mysql.connector.Error:
+                pass
+        self.close()
+        return False
+
+
+# ---------------------------
+# Connection pool
+# ---------------------------
+class ConnectionPool:
+    """Process-wide MySQL connection pool with health checks and max-lifetime recycling"""
+
+    def __init__(self, connect_args, min_size=1, max_size=10, max_lifetime=1800,
+                 health_check_interval=30, checkout_timeout=10):
+        self.connect_args = connect_args
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+
+        self._idle = deque()        # _PoolEntry objects; handles are created per checkout
+        self._leaked = deque()      # raw connections of handles garbage-collected while checked out
+        self._size = 0
+        self._cond = threading.Condition()
+
+        self._stats = {
+            "checkouts": 0,
+            "connections_created": 0,
+            "connections_recycled": 0,
+            "connections_leaked": 0,
+            "health_check_failures": 0,
+            "checkout_timeouts": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+        for _ in range(min_size):
+            try:
+                self._idle.append(self._open())
+                self._size += 1
+            except mysql.connector.Error as err:
+                print(f"Database pool warm-up failed: {err}")
+                break
+
+    def _open(self):
+        raw = mysql.connector.connect(**self.connect_args)
+        with self._cond:
+            self._stats["connections_created"] += 1
+        print("Database connection successful UAT")
+        return _PoolEntry(raw)
+
+    @staticmethod
+    def _close_raw(raw):
+        try:
+            raw.close()
+        except mysql.connector.Error:
+            pass
+
+    def _discard(self, entry):
+        # Network close happens outside the pool lock
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        self._close_raw(entry.raw)
+
+    def _reap_leaked(self):
+        """Caller holds the lock; frees the slots of leaked connections, returns them for closing"""
+        reaped = []
+        while self._leaked:
+            reaped.append(self._leaked.popleft())
+            self._size -= 1
+            self._stats["connections_leaked"] += 1
+        return reaped
+
+    def _is_usable(self, entry):
+        # Runs without the pool lock: is_connected() is a network round-trip
+        now = time.monotonic()
+
+        if self.max_lifetime and now - entry.created_at > self.max_lifetime:
+            with self._cond:
+                self._stats["connections_recycled"] += 1
+            return False
+
+        if now - entry.last_used > self.health_check_interval:
+            if not entry.raw.is_connected():
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                return False
+
+        return True
+
+    def acquire(self):
+        start = time.monotonic()
+        deadline = start + self.checkout_timeout
+
+        while True:
+            candidate = None
+            reaped = []
+
+            try:
+                with self._cond:
+                    reaped = self._reap_leaked()
+                    while True:
+                        if self._idle:
+                            candidate = self._idle.pop()
+                            break
+
+                        if self._size < self.max_size:
+                            # Reserve the slot now, connect outside the lock
+                            self._size += 1
+                            break
+
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._stats["checkout_timeouts"] += 1
+                            raise mysql.connector.errors.PoolError(
+                                f"No connection available within {self.checkout_timeout}s "
+                                f"(pool size {self.max_size})"
+                            )
+                        # Wake up now and then: leaked slots come back without a notify()
+                        self._cond.wait(min(remaining, 1.0))
+                        reaped.extend(self._reap_leaked())
+            finally:
+                for raw in reaped:
+                    self._close_raw(raw)
+
+            if candidate is None:
+                try:
+                    entry = self._open()
+                except mysql.connector.Error:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                break
+
+            # Health check outside the lock, so one slow ping doesn't stall every checkout
+            if self._is_usable(candidate):
+                entry = candidate
+                break
+            self._discard(candidate)
+
+        waited = time.monotonic() - start
+        with self._cond:
+            self._stats["checkouts"] += 1
+            self._stats["total_wait_seconds"] += waited
+            self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+
+        return PooledConnection(self, entry)
+
+    def release(self, entry):
+        # Drop anything the caller left behind so the next user gets a clean session
+        raw = entry.raw
+        try:
+            if raw.unread_result:
+                raw.consume_results()
+            if raw.in_transaction:
+                raw.rollback()
+            healthy = True
+        except mysql.connector.Error:
+            healthy = False
+
+        if not healthy:
+            self._discard(entry)
+            return
+
+        with self._cond:
+            entry.last_used = time.monotonic()
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats["size"] = self._size
+            stats["idle"] = len(self._idle)
+            stats["in_use"] = self._size - len(self._idle)
+            stats["avg_wait_seconds"] = (
+                stats["total_wait_seconds"] / stats["checkouts"] if stats["checkouts"] else 0.0
+            )
+        return stats
+
+    def close_all(self):
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for entry in idle:
+            self._discard(entry)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide pool, creating it from config.ini on first use"""
+    global _pool
+
+    if _pool is not None:
+        return _pool
+
+    with _pool_lock:
+        if _pool is None:
+            config = load_config()
+
+            connect_args = {
+                "host": config['mysql']['host'],
+                "user": config['mysql']['user'],
+                "password": config['mysql']['password'],
+                "database": config['mysql']['database'],
+                "autocommit": True,
+                # UPDATE rowcount = rows matched, not rows changed, so 0 really means "no such row"
+                "client_flags": [ClientFlag.FOUND_ROWS],
+            }
+
+            _pool = ConnectionPool(
+                connect_args,
+                min_size=config.getint('pool', 'min_size', fallback=1),
+                max_size=config.getint('pool', 'max_size', fallback=10),
+                max_lifetime=config.getint('pool', 'max_lifetime', fallback=1800),
+                health_check_interval=config.getint('pool', 'health_check_interval', fallback=30),
+                checkout_timeout=config.getint('pool', 'checkout_timeout', fallback=10),
+            )
+
+    return _pool
+
+
 def get_connection():
-    """Connect to MySQL using credentials from config/config.ini"""
-    
-    # Absolute path to config.ini
-    config_path = os.path.join(os.path.dirname(__file__), 'config', 'config.ini')
-    
-    if not os.path.exists(config_path):
-        raise FileNotFoundError(f"Config file not found at {config_path}")
-    
-    # Read credentials from config.ini
-    config = configparser.ConfigParser()
-    config.read(config_path)
-    
-    host = config['mysql']['host']
-    user = config['mysql']['user']
-    password = config['mysql']['password']
-    database = config['mysql']['database']
-    
+    """Check out a pooled MySQL connection; conn.close() returns it to the pool"""
     try:
-        connection = mysql.connector.connect(
-            host=host,
-            user=user,
-            password=password,
-            database=database,
-            autocommit=True 
-        )
-        print("Database connection successful UAT")
-        return connection
+        return get_pool().acquire()
     except mysql.connector.Error as err:
         print(f"Database connection UAT failed: {err}")
         return None
 
 
+@contextmanager
+def pooled_connection():
+    """with pooled_connection() as conn: ... -- always returned to the pool"""
+    # The handle rolls back on error and tolerates a close() inside the block
+    with get_pool().acquire() as conn:
+        yield conn
+
+
+def get_pool_stats():
+    """Checkout counts and wait times for the shared pool"""
+    return get_pool().stats()
+
+
 if __name__ == '__main__':
-    conn = get_connection()
\ No newline at end of file
+    conn = get_connection()
+    print(get_pool_stats())
@@ -0,0 +1,55 @@
+import sqlite3
+import datetime
+import threading
+
+# --------------------------------------
+# CHUNKED DELETE CHECKPOINTS (SQLite)
+# --------------------------------------
+DEFAULT_STATE_FILE = "delete_state.sqlite"
+
+
+class DeleteState:
+    """Last deleted key of every unfinished chunked delete, so a restarted delete picks up where it stopped"""
+
+    def __init__(self, path=DEFAULT_STATE_FILE):
+        self.path = path
+        # Shared by the request threads and the background delete jobs
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS delete_state (
+                table_name TEXT PRIMARY KEY,
+                last_key TEXT,
+                rows_deleted INTEGER NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def load(self, table_name):
+        """{"last_key", "rows_deleted", "updated_at"} or None when no delete is pending"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT last_key, rows_deleted, updated_at FROM delete_state WHERE table_name = ?", (table_name,)
+            ).fetchone()
+        if row is None:
+            return None
+        last_key, rows_deleted, updated_at = row
+        return {"last_key": last_key, "rows_deleted": rows_deleted, "updated_at": updated_at}
+
+    def save(self, table_name, last_key, rows_deleted):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO delete_state VALUES (?, ?, ?, ?)",
+                (table_name, None if last_key is None else str(last_key), rows_deleted,
+                 datetime.datetime.now().isoformat(timespec="seconds")),
+            )
+            self.conn.commit()
+
+    def clear(self, table_name):
+        with self._lock:
+            self.conn.execute("DELETE FROM delete_state WHERE table_name = ?", (table_name,))
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,147 @@
+import io
+import csv
+import gzip
+import json
+import decimal
+import datetime
+import functools
+from flask import Response, request
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:     # falls back to the stdlib encoder, same output, just slower
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:     # gzip is always available
+    zstandard = None
+
+try:
+    import pyarrow as pa
+except ImportError:     # format=arrow is optional; json and csv always work
+    pa = None
+
+# --------------------------------------
+# FAST RESPONSE ENCODING
+# --------------------------------------
+# MySQL hands back Decimal, datetime, date, timedelta and bytes values. Decimal goes out as a
+# string, like jsonify always sent it, so DECIMAL columns keep their precision; clients that
+# want numbers opt in with decimal_as_float. Dates keep jsonify's HTTP-date format
+# ("Tue, 02 Jan 2024 03:04:05 GMT"), or str() for callers that used json.dumps(default=str);
+# dates="iso" opts in to ISO 8601. bytes become hex, the same as in report_writer.
+COMPRESS_MIN_BYTES = 1024   # smaller bodies are not worth compressing
+GZIP_LEVEL = 5
+ZSTD_LEVEL = 3
+FORMATS = ("json", "csv", "arrow")
+
+
+def _default(value, decimal_as_float=False, dates="http"):
+    if isinstance(value, decimal.Decimal):
+        return float(value) if decimal_as_float else str(value)
+    if isinstance(value, datetime.date):    # datetime too
+        if dates == "iso":
+            return value.isoformat()
+        return http_date(value) if dates == "http" else str(value)
+    if isinstance(value, datetime.time):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    if hasattr(value, "item"):         # numpy scalars from the recommendation engine
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def encode_json(obj, decimal_as_float=False, dates="http"):
+    """obj -> JSON bytes, with orjson when it is installed"""
+    default = functools.partial(_default, decimal_as_float=decimal_as_float, dates=dates)
+    if orjson is not None:
+        # orjson would write dates as ISO itself; pass them through so _default picks the format
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        return orjson.dumps(obj, default=default, option=option)
+    return json.dumps(obj, default=default, separators=(",", ":")).encode("utf-8")
+
+
+def encode_csv(rows, columns):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    for row in rows:
+        # str(Decimal) keeps every digit; binary values as hex
+        writer.writerow([
+            value.hex() if isinstance(value, (bytes, bytearray)) else value
+            for value in (row.get(c) for c in columns)
+        ])
+    return out.getvalue().encode("utf-8")
+
+
+def encode_arrow(rows, columns):
+    """Arrow IPC stream; pandas / polars / DuckDB read it without any JSON parsing"""
+    if pa is None:
+        raise RuntimeError("format=arrow needs pyarrow (pip install pyarrow)")
+    # Decimal -> decimal128 and bytes -> binary natively, nothing is rounded
+    table = pa.table({c: [row.get(c) for row in rows] for c in columns})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def negotiate_encoding(accept_encoding):
+    """Best encoding the client accepts: zstd (when installed), then gzip, else None"""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.lower()] = q
+
+    if zstandard is not None and accepted.get("zstd", 0) > 0:
+        return "zstd"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def fast_response(body, status=200, mimetype="application/json", headers=None):
+    """Response from encoded bytes, compressed when the client allows it and the body is big enough"""
+    response = Response(body, status=status, mimetype=mimetype, headers=headers)
+    response.headers["Vary"] = "Accept-Encoding"
+
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+    if encoding and len(body) >= COMPRESS_MIN_BYTES:
+        response.set_data(compress(body, encoding))
+        response.headers["Content-Encoding"] = encoding
+
+    return response
+
+
+def json_response(obj, status=200, headers=None, decimal_as_float=False, dates="http"):
+    """Drop-in for jsonify() on large payloads"""
+    return fast_response(encode_json(obj, decimal_as_float, dates), status, "application/json", headers)
+
+
+def rows_response(result, rows, columns, fmt="json", status=200, headers=None, decimal_as_float=False,
+                  dates="http"):
+    """format=json sends the whole result; csv and arrow send just the rows, column by column"""
+    if fmt == "csv":
+        return fast_response(encode_csv(rows, columns), status, "text/csv", headers)
+    if fmt == "arrow":
+        return fast_response(encode_arrow(rows, columns), status,
+                             "application/vnd.apache.arrow.stream", headers)
+    return json_response(result, status, headers, decimal_as_float, dates)
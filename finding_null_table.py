@@ -1,90 +1,619 @@
-from db_connector import get_connection
+from db_connector import get_pool, pooled_connection
+from profile_state import ProfileState, DEFAULT_STATE_FILE, make_fingerprint, diff_results
+from report_writer import open_report
 import pandas as pd
+import math
+import time
+import random
+import argparse
+import mysql.connector
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def find_column_data_issues():
-    conn = get_connection()
-    cursor = conn.cursor()
+STRING_TYPES = ('char', 'varchar', 'text', 'mediumtext', 'longtext')
+QUERY_TIMEOUT_ERROR = 3024  # ER_QUERY_TIMEOUT from MAX_EXECUTION_TIME
+INTEGER_TYPES = ('tinyint', 'smallint', 'mediumint', 'int', 'bigint')
 
+# Fast mode
+SAMPLE_SIZE = 10000         # rows read per table
+SAMPLE_BLOCKS = 20          # random primary-key ranges the sample is spread over
+Z_95 = 1.96
+
+# Column statistics (--stats)
+EXACT_DISTINCT_MAX_ROWS = 1000000   # above this, distinct values are estimated (index stats or the sample)
+LENGTH_BUCKETS = [(0, 0), (1, 10), (11, 50), (51, 255), (256, None)]
+TOP_VALUES = 5
+
+# Report layout
+BASE_COLUMNS = ["Schema", "Table", "Column", "Data Type", "Status",
+                "Total Rows", "Non-NULL Rows", "Non-Space Rows"]
+FAST_COLUMNS = ["Estimated", "Sample Rows", "Sample Method", "Non-NULL % Low", "Non-NULL % High"]
+STATS_COLUMNS = ["Distinct Values", "Distinct Approx", "Min", "Max", "Min Length", "Max Length",
+                 "Avg Length", "Length Histogram", "Top Values", "Top Values Sampled"]
+CHANGE_COLUMNS = ["Change Since Last Run"]
+COLUMN_TYPES = {
+    "Total Rows": "int", "Non-NULL Rows": "int", "Non-Space Rows": "int", "Sample Rows": "int",
+    "Distinct Values": "int", "Min Length": "int", "Max Length": "int",
+    "Non-NULL % Low": "float", "Non-NULL % High": "float", "Avg Length": "float",
+    "Estimated": "bool", "Distinct Approx": "bool", "Top Values Sampled": "bool",
+}
+DEFAULT_REPORT_FILE = "data_quality_issues_report_fixed.xlsx"
+
+
+def get_schema_columns(cursor):
+    """{(schema, table): [(column, data_type), ...]} for the current database"""
     cursor.execute("""
         SELECT table_schema, table_name, column_name, data_type
         FROM information_schema.columns
         WHERE table_schema = DATABASE()
+        ORDER BY table_name, ordinal_position
     """)
 
-    columns = cursor.fetchall()
-    results = []
+    tables = {}
+    for schema, table, column, data_type in cursor.fetchall():
+        tables.setdefault((schema, table), []).append((column, data_type))
+    return tables
+
+
+def get_table_sizes(cursor):
+    """InnoDB row estimates from information_schema.tables (no table scan)"""
+    cursor.execute("""
+        SELECT table_name, table_rows
+        FROM information_schema.tables
+        WHERE table_schema = DATABASE()
+    """)
+    return {table: rows or 0 for table, rows in cursor.fetchall()}
+
+
+def get_update_times(cursor):
+    # MySQL 8 serves UPDATE_TIME from a cache for up to information_schema_stats_expiry
+    # (a day by default); read it live, then hand the session back to the pool as it was
+    try:
+        cursor.execute("SET SESSION information_schema_stats_expiry = 0")
+        live = True
+    except mysql.connector.Error:   # 5.7 has no such variable and is always live
+        live = False
+
+    try:
+        cursor.execute("""
+            SELECT table_name, update_time
+            FROM information_schema.tables
+            WHERE table_schema = DATABASE()
+        """)
+        return dict(cursor.fetchall())
+    finally:
+        if live:
+            cursor.execute("SET SESSION information_schema_stats_expiry = DEFAULT")
+
+
+def get_max_id(cursor, schema, table, pk):
+    # Index lookup, not a scan
+    cursor.execute(f"SELECT MAX(`{pk}`) FROM `{schema}`.`{table}`")
+    return as_int(cursor.fetchone()[0])
+
+
+def get_not_null_columns(cursor):
+    cursor.execute("""
+        SELECT table_name, column_name
+        FROM information_schema.columns
+        WHERE table_schema = DATABASE()
+          AND is_nullable = 'NO'
+    """)
+    return set(cursor.fetchall())
+
+
+def get_integer_primary_keys(cursor):
+    """{table: pk column} for tables whose primary key is a single integer column"""
+    cursor.execute("""
+        SELECT k.table_name, MIN(k.column_name), MIN(c.data_type)
+        FROM information_schema.key_column_usage k
+        JOIN information_schema.columns c
+          ON c.table_schema = k.table_schema
+         AND c.table_name = k.table_name
+         AND c.column_name = k.column_name
+        WHERE k.table_schema = DATABASE()
+          AND k.constraint_name = 'PRIMARY'
+        GROUP BY k.table_name
+        HAVING COUNT(*) = 1
+    """)
+    return {table: column for table, column, data_type in cursor.fetchall() if data_type in INTEGER_TYPES}
+
+
+def get_index_cardinality(cursor):
+    """{(table, column): distinct values} from index statistics, for leading index columns"""
+    cursor.execute("""
+        SELECT table_name, column_name, MAX(cardinality)
+        FROM information_schema.statistics
+        WHERE table_schema = DATABASE()
+          AND seq_in_index = 1
+        GROUP BY table_name, column_name
+    """)
+    return {(table, column): cardinality or 0 for table, column, cardinality in cursor.fetchall()}
+
 
-    for schema, table, column, data_type in columns:
-        schema_quoted = f"`{schema}`"
-        table_quoted = f"`{table}`"
+def stats_expressions(i, column_quoted, data_type, exact_distinct):
+    """Extra aggregates for --stats; parse_stats reads them back in the same order"""
+    select = []
+
+    # Big tables get an estimate instead (see estimate_distinct); an in-SQL HyperLogLog needs
+    # one hash per register per value and a well-mixed hash to be usable
+    if exact_distinct:
+        select.append(f"COUNT(DISTINCT {column_quoted}) AS c{i}_distinct")
+
+    select.append(f"MIN({column_quoted}) AS c{i}_min")
+    select.append(f"MAX({column_quoted}) AS c{i}_max")
+
+    if data_type in STRING_TYPES:
+        length = f"CHAR_LENGTH({column_quoted})"
+        select.append(f"MIN({length}) AS c{i}_min_len")
+        select.append(f"MAX({length}) AS c{i}_max_len")
+        select.append(f"AVG({length}) AS c{i}_avg_len")
+        for b, (low, high) in enumerate(LENGTH_BUCKETS):
+            condition = f"{length} >= {low}" if high is None else f"{length} BETWEEN {low} AND {high}"
+            select.append(f"SUM(CASE WHEN {condition} THEN 1 ELSE 0 END) AS c{i}_len{b}")
+
+    return select
+
+
+def report_value(value):
+    # Binary MIN/MAX doesn't belong in a spreadsheet cell
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return value
+
+
+def parse_stats(values, data_type, exact_distinct):
+    stats = {}
+
+    if exact_distinct:
+        stats["Distinct Values"] = as_int(next(values))
+        stats["Distinct Approx"] = False
+
+    stats["Min"] = report_value(next(values))
+    stats["Max"] = report_value(next(values))
+
+    if data_type in STRING_TYPES:
+        stats["Min Length"] = as_int(next(values))
+        stats["Max Length"] = as_int(next(values))
+        avg = next(values)
+        stats["Avg Length"] = None if avg is None else round(float(avg), 1)
+        buckets = [as_int(next(values)) or 0 for _ in LENGTH_BUCKETS]
+        stats["Length Histogram"] = ", ".join(
+            f"{low}{'+' if high is None else '' if high == low else f'-{high}'}: {count}"
+            for (low, high), count in zip(LENGTH_BUCKETS, buckets)
+        )
+
+    return stats
+
+
+def top_values(cursor, schema, table, columns, pk):
+    """Most common values per column from the bounded sample (the whole table when it is small).
+
+    Also returns (distinct, non-NULL, seen once) counts of the sample for estimate_distinct.
+    """
+    source, params, _ = build_sample_source(schema, table, columns, pk, cursor)
+    cursor.execute(f"SELECT * FROM {source} AS sample", params)
+    sample = pd.DataFrame(cursor.fetchall(), columns=[column for column, _ in columns])
+
+    top = {}
+    distinct = {}
+    for column, _ in columns:
+        counts = sample[column].dropna().map(report_value).value_counts()
+        top[column] = ", ".join(f"{value} ({count})" for value, count in counts.head(TOP_VALUES).items())
+        distinct[column] = (len(counts), int(counts.sum()), int((counts == 1).sum()))
+    return top, distinct, len(sample)
+
+
+def estimate_distinct(sample_distinct, non_null, index_cardinality=None):
+    """Distinct non-NULL values of a column too big for COUNT(DISTINCT).
+
+    Leading index columns use InnoDB's cardinality statistic. Otherwise the Haas-Stokes Duj1
+    estimator (what PostgreSQL's ANALYZE uses) scales the sample: values seen once stand
+    for the unseen ones, so an all-unique sample estimates an all-unique column.
+    """
+    d, n, f1 = sample_distinct
+    if index_cardinality:
+        return max(min(index_cardinality, non_null), d)
+    if not n or n >= non_null:
+        return d
+    estimate = n * d / (n - f1 + f1 * n / non_null)
+    return round(min(max(estimate, d), non_null))
+
+
+def build_profile_query(schema, table, columns, timeout=None, source=None, stats=None):
+    """One aggregate query that profiles every column of the table in a single scan"""
+    select = ["COUNT(*) AS total_rows"]
+
+    for i, (column, data_type) in enumerate(columns):
         column_quoted = f"`{column}`"
+        select.append(f"SUM(CASE WHEN {column_quoted} IS NOT NULL THEN 1 ELSE 0 END) AS c{i}_non_null")
 
         # For all string types, use LENGTH(TRIM()) to avoid collation issues
-        if data_type in ('char','varchar','text','mediumtext','longtext'):
-            query = f"""
-                SELECT
-                    COUNT(*) AS total_rows,
-                    SUM(CASE WHEN {column_quoted} IS NOT NULL THEN 1 ELSE 0 END) AS non_null_rows,
-                    SUM(CASE WHEN {column_quoted} IS NOT NULL AND LENGTH(TRIM({column_quoted})) > 0 THEN 1 ELSE 0 END) AS non_space_rows
-                FROM {schema_quoted}.{table_quoted}
-            """
-        else:
-            # For other types, only check for NULLs
-            query = f"""
-                SELECT
-                    COUNT(*) AS total_rows,
-                    SUM(CASE WHEN {column_quoted} IS NOT NULL THEN 1 ELSE 0 END) AS non_null_rows
-                FROM {schema_quoted}.{table_quoted}
-            """
+        if data_type in STRING_TYPES:
+            select.append(
+                f"SUM(CASE WHEN {column_quoted} IS NOT NULL AND LENGTH(TRIM({column_quoted})) > 0 "
+                f"THEN 1 ELSE 0 END) AS c{i}_non_space"
+            )
 
-        try:
-            cursor.execute(query)
+        if stats is not None:
+            select.extend(stats_expressions(i, column_quoted, data_type, stats["exact_distinct"]))
 
-            if data_type in ('char','varchar','text','mediumtext','longtext'):
-                total, non_null, non_space = cursor.fetchone()
-            else:
-                total, non_null = cursor.fetchone()
-                non_space = None
-
-            # Only include columns/tables with issues
-            if total == 0:
-                status = "EMPTY TABLE"
-            elif non_null == 0:
-                status = "COLUMN ALL NULL"
-            elif non_space == 0 and non_space is not None:
-                status = "COLUMN NULL OR SPACES ONLY"
-            elif non_null < total:
+    # Optimizer hint instead of a session variable, so pooled connections stay untouched
+    hint = f"/*+ MAX_EXECUTION_TIME({int(timeout * 1000)}) */ " if timeout else ""
+    source = f"{source} AS sample" if source else f"`{schema}`.`{table}`"
+    return f"SELECT {hint}{', '.join(select)} FROM {source}"
+
+
+def classify(total, non_null, non_space):
+    if total == 0:
+        return "EMPTY TABLE"
+    elif non_null == 0:
+        return "COLUMN ALL NULL"
+    elif non_space == 0 and non_space is not None:
+        return "COLUMN NULL OR SPACES ONLY"
+    elif non_null < total:
+        return "COLUMN HAS DATA BUT SOME NULLS"
+    return None  # Fully populated, skip
+
+
+def as_int(value):
+    # SUM() comes back as Decimal, and NULL on an empty table
+    return None if value is None else int(value)
+
+
+def profile_table(cursor, schema, table, columns, timeout=None, stats=None):
+    """Issue rows for the table; with stats, a row for every column plus its statistics"""
+    cursor.execute(build_profile_query(schema, table, columns, timeout, stats=stats))
+    row = cursor.fetchone()
+
+    total = as_int(row[0])
+    values = iter(row[1:])
+    results = []
+
+    if stats is not None and total:
+        top, sample_distinct, sampled = top_values(cursor, schema, table, columns, stats["pk"])
+
+    for column, data_type in columns:
+        non_null = as_int(next(values))
+        non_space = as_int(next(values)) if data_type in STRING_TYPES else None
+        column_stats = parse_stats(values, data_type, stats["exact_distinct"]) if stats is not None else None
+
+        # Only include columns/tables with issues (every column when collecting stats)
+        status = classify(total, non_null, non_space)
+        if status is None:
+            if stats is None:
+                continue
+            status = "OK"
+
+        result = {
+            "Schema": schema,
+            "Table": table,
+            "Column": column,
+            "Data Type": data_type,
+            "Status": status,
+            "Total Rows": total,
+            "Non-NULL Rows": non_null,
+            "Non-Space Rows": non_space
+        }
+        if column_stats is not None:
+            result.update(column_stats)
+            if total:
+                result["Top Values"] = top[column]
+                result["Top Values Sampled"] = sampled < total
+                if not stats["exact_distinct"]:
+                    result["Distinct Values"] = estimate_distinct(
+                        sample_distinct[column], non_null, stats["cardinality"].get((table, column)))
+                    result["Distinct Approx"] = True
+        results.append(result)
+
+    return results
+
+
+# --------------------------------------
+# FAST (SAMPLED) PROFILING
+# --------------------------------------
+def wilson_interval(hits, n):
+    """95% confidence interval for a proportion observed as hits out of n"""
+    if n == 0:
+        return 0.0, 1.0
+    p = hits / n
+    denom = 1 + Z_95 ** 2 / n
+    centre = (p + Z_95 ** 2 / (2 * n)) / denom
+    margin = Z_95 * math.sqrt(p * (1 - p) / n + Z_95 ** 2 / (4 * n * n)) / denom
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def build_sample_source(schema, table, columns, pk, cursor):
+    """Subquery reading SAMPLE_SIZE rows as random primary-key ranges (index range scans, not a full scan)"""
+    column_list = ", ".join(f"`{column}`" for column, _ in columns)
+
+    if pk is None:
+        # No integer key to jump around in: bounded, but only the first rows
+        return f"(SELECT {column_list} FROM `{schema}`.`{table}` LIMIT {SAMPLE_SIZE})", (), "first rows"
+
+    cursor.execute(f"SELECT MIN(`{pk}`), MAX(`{pk}`) FROM `{schema}`.`{table}`")
+    low, high = cursor.fetchone()
+    if low is None:
+        return f"(SELECT {column_list} FROM `{schema}`.`{table}` LIMIT 0)", (), "empty"
+
+    block = SAMPLE_SIZE // SAMPLE_BLOCKS
+    starts = sorted(random.randint(low, high) for _ in range(SAMPLE_BLOCKS))
+    parts = [
+        f"(SELECT {column_list} FROM `{schema}`.`{table}` WHERE `{pk}` >= %s ORDER BY `{pk}` LIMIT {block})"
+        for _ in starts
+    ]
+    return "(" + " UNION ALL ".join(parts) + ")", tuple(starts), "random pk ranges"
+
+
+def fast_profile_table(cursor, schema, table, columns, meta, timeout=None):
+    """Metadata first, then a bounded sample; exact scan only for columns the sample can't settle"""
+    estimated_rows = meta["rows"]
+
+    # Small tables: the exact single pass is as cheap as sampling
+    if estimated_rows <= SAMPLE_SIZE:
+        return [dict(r, **{"Estimated": False}) for r in profile_table(cursor, schema, table, columns, timeout)]
+
+    # A NOT NULL non-string column can hold neither NULLs nor blanks
+    columns = [(column, data_type) for column, data_type in columns
+               if data_type in STRING_TYPES or (table, column) not in meta["not_null"]]
+    if not columns:
+        return []
+
+    source, params, method = build_sample_source(schema, table, columns, meta["pk"], cursor)
+    cursor.execute(build_profile_query(schema, table, columns, timeout, source), params)
+    row = cursor.fetchone()
+
+    sampled = as_int(row[0])
+    values = iter(row[1:])
+    results = []
+    unsettled = []
+
+    for column, data_type in columns:
+        non_null = as_int(next(values))
+        non_space = as_int(next(values)) if data_type in STRING_TYPES else None
+
+        if sampled == 0:
+            unsettled.append((column, data_type))
+            continue
+
+        # Zero non-NULL / non-blank rows in the sample is a threshold case: a sample cannot prove it.
+        # Index statistics can: two distinct values in an index means real data exists.
+        if non_null == 0 or non_space == 0:
+            if non_null == 0 and meta["cardinality"].get((table, column), 0) > 1:
                 status = "COLUMN HAS DATA BUT SOME NULLS"
             else:
-                continue  # Fully populated, skip
-
-            results.append({
-                "Schema": schema,
-                "Table": table,
-                "Column": column,
-                "Data Type": data_type,
-                "Status": status,
-                "Total Rows": total,
-                "Non-NULL Rows": non_null,
-                "Non-Space Rows": non_space
-            })
-
-        except Exception as e:
-            print(f"Error processing {schema}.{table}.{column}: {e}")
-            conn.rollback()
-            continue
+                unsettled.append((column, data_type))
+                continue
+        elif non_null < sampled:
+            status = "COLUMN HAS DATA BUT SOME NULLS"
+        else:
+            continue  # Fully populated in the sample, skip
+
+        low, high = wilson_interval(non_null, sampled)
+        results.append({
+            "Schema": schema,
+            "Table": table,
+            "Column": column,
+            "Data Type": data_type,
+            "Status": status,
+            "Total Rows": estimated_rows,
+            "Non-NULL Rows": round(non_null / sampled * estimated_rows),
+            "Non-Space Rows": round(non_space / sampled * estimated_rows) if non_space is not None else None,
+            "Estimated": True,
+            "Sample Rows": sampled,
+            "Sample Method": method,
+            "Non-NULL % Low": round(low * 100, 2),
+            "Non-NULL % High": round(high * 100, 2),
+        })
+
+    # One exact pass over just the columns the sample could not decide
+    if unsettled:
+        exact = profile_table(cursor, schema, table, unsettled, timeout)
+        results.extend(dict(r, **{"Estimated": False}) for r in exact)
 
-    cursor.close()
-    conn.close()
+    return results
+
+
+def timed_out_result(schema, table, timeout):
+    return {
+        "Schema": schema,
+        "Table": table,
+        "Column": None,
+        "Data Type": None,
+        "Status": f"PROFILING TIMED OUT AFTER {timeout}s",
+        "Total Rows": None,
+        "Non-NULL Rows": None,
+        "Non-Space Rows": None
+    }
+
+
+def profile_table_worker(schema, table, columns, timeout, started_at, meta=None, stats=None):
+    """Runs on a worker thread with its own pooled connection"""
+    started_at[(schema, table)] = time.perf_counter()
+    # Raises PoolError instead of handing back None when no connection frees up
+    with pooled_connection() as conn:
+        cursor = conn.cursor(buffered=True)  # several queries per table on one cursor
+        try:
+            if meta is not None:
+                return fast_profile_table(cursor, schema, table, columns, meta, timeout)
+            return profile_table(cursor, schema, table, columns, timeout, stats)
+        finally:
+            cursor.close()
+
+
+def report_columns(fast=False, stats=False, state=False):
+    return (BASE_COLUMNS + (FAST_COLUMNS if fast else []) + (STATS_COLUMNS if stats else [])
+            + (CHANGE_COLUMNS if state else []))
+
+
+def find_column_data_issues(workers=1, timeout=None, fast=False, state=None, incremental=True,
+                            stats=False, writer=None):
+    """Profile every table; with a ProfileState, unchanged tables reuse their last results.
+
+    Without a writer the rows come back as a list in schema order. With one, each table's
+    rows are written the moment it finishes and only the row count is returned.
+    """
+    mode = "fast" if fast else "stats" if stats else "exact"
+    # Metadata reads; the connection goes back to the pool even if one of them fails
+    with pooled_connection() as conn:
+        cursor = conn.cursor(buffered=True)
+
+        tables = get_schema_columns(cursor)
+        sizes = get_table_sizes(cursor)
+        primary_keys = get_integer_primary_keys(cursor)
+
+        if fast:
+            not_null = get_not_null_columns(cursor)
+        if fast or stats:
+            cardinality = get_index_cardinality(cursor)
+
+        previous = {}
+        fingerprints = {}
+        if state is not None:
+            previous = state.load()
+            update_times = get_update_times(cursor)
+            for schema, table in tables:
+                pk = primary_keys.get(table)
+                max_id = get_max_id(cursor, schema, table, pk) if pk else None
+                fingerprints[(schema, table)] = make_fingerprint(
+                    update_times.get(table), max_id, tables[(schema, table)], mode)
+
+        cursor.close()
+
+    results = []
+    written = 0
+
+    def emit(key, rows, compare=True):
+        nonlocal written
+        if state is not None and compare:
+            rows = diff_results(previous[key]["results"] if key in previous else [], rows)
+        written += len(rows)
+        if writer is None:
+            results.extend(rows)
+        else:
+            writer.write_rows(rows)
+
+    # Unchanged since the last run: reuse the stored results, no scan
+    unchanged = {
+        key for key in tables
+        if incremental
+        and fingerprints.get(key) is not None
+        and key in previous
+        and previous[key]["fingerprint"] == fingerprints[key]
+    }
+    for key in tables:
+        if key in unchanged:
+            emit(key, previous[key]["results"])
+    if state is not None:
+        print(f"{len(unchanged)} unchanged table(s) skipped, {len(tables) - len(unchanged)} to profile")
+
+    # Largest tables first so the long scans start early and small ones fill the gaps
+    order = sorted((key for key in tables if key not in unchanged),
+                   key=lambda key: sizes.get(key[1], 0), reverse=True)
+    started = time.perf_counter()
+    started_at = {}
+    failed = []
+
+    # Workers beyond the pool size would only wait for a connection until checkout_timeout
+    max_size = get_pool().max_size
+    if workers > max_size:
+        print(f"--workers {workers} is more than the pool's max_size {max_size}; using {max_size}")
+        workers = max_size
+
+    # One scan per table instead of one per column, spread over `workers` connections
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for schema, table in order:
+            meta = None
+            if fast:
+                meta = {
+                    "rows": sizes.get(table, 0),
+                    "not_null": not_null,
+                    "pk": primary_keys.get(table),
+                    "cardinality": cardinality,
+                }
+            table_stats = None
+            if stats:
+                table_stats = {
+                    "exact_distinct": sizes.get(table, 0) <= EXACT_DISTINCT_MAX_ROWS,
+                    "pk": primary_keys.get(table),
+                    "cardinality": cardinality,
+                }
+            future = executor.submit(profile_table_worker, schema, table, tables[(schema, table)],
+                                     timeout, started_at, meta, table_stats)
+            futures[future] = (schema, table)
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            schema, table = futures[future]
+            try:
+                table_results = future.result()
+                outcome = f"{len(table_results)} issue(s)"
+                if state is not None and fingerprints.get((schema, table)) is not None:
+                    state.save(schema, table, fingerprints[(schema, table)], table_results)
+                emit((schema, table), table_results)
+            except mysql.connector.Error as e:
+                if e.errno == QUERY_TIMEOUT_ERROR:
+                    # Not compared with last run: a timeout doesn't resolve anything
+                    emit((schema, table), [timed_out_result(schema, table, timeout)], compare=False)
+                    outcome = "TIMED OUT"
+                else:
+                    print(f"Error processing {schema}.{table}: {e}")
+                    outcome = "ERROR"
+                    failed.append(f"{schema}.{table}")
+            except Exception as e:
+                print(f"Error processing {schema}.{table}: {e}")
+                outcome = "ERROR"
+                failed.append(f"{schema}.{table}")
+
+            print(f"[{done}/{len(order)}] {schema}.{table} "
+                  f"(~{sizes.get(table, 0)} rows) "
+                  f"{time.perf_counter() - started_at[(schema, table)]:.1f}s: {outcome}")
+
+    print(f"Profiled {len(order)} tables in {time.perf_counter() - started:.1f}s")
+    if failed:
+        print(f"WARNING: {len(failed)} table(s) failed and are missing from the report: {', '.join(failed)}")
+
+    if state is not None:
+        state.forget_missing(tables)
+
+    if writer is not None:
+        return written
+
+    # Report keeps schema order no matter which worker finished first
+    rank = {key: i for i, key in enumerate(tables)}
+    results.sort(key=lambda r: rank[(r["Schema"], r["Table"])])
     return results
 
 if __name__ == "__main__":
-    data = find_column_data_issues()
+    parser = argparse.ArgumentParser(description="Find NULL / blank-only columns in every table")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="tables profiled in parallel, one pooled connection each")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="per-table query timeout in seconds")
+    parser.add_argument("--fast", action="store_true",
+                        help="estimate large tables from metadata and a sample; exact scan only when unsure")
+    parser.add_argument("--stats", action="store_true",
+                        help="report every column with distinct count, min/max, lengths and top values")
+    parser.add_argument("--state", default=DEFAULT_STATE_FILE,
+                        help="SQLite file with last run's results; unchanged tables are not re-scanned")
+    parser.add_argument("--full", action="store_true",
+                        help="ignore saved state and profile every table")
+    parser.add_argument("--output", default=DEFAULT_REPORT_FILE,
+                        help="report file, written as tables finish: .xlsx, .csv, .jsonl or .parquet")
+    args = parser.parse_args()
+    if args.fast and args.stats:
+        parser.error("--stats needs the exact scan and can't be combined with --fast")
+
+    state = ProfileState(args.state)
+    writer = open_report(args.output, report_columns(args.fast, args.stats, state=True), COLUMN_TYPES)
+    try:
+        written = find_column_data_issues(workers=args.workers, timeout=args.timeout,
+                                          fast=args.fast, state=state, incremental=not args.full,
+                                          stats=args.stats, writer=writer)
+    finally:
+        writer.close()
+        state.close()
 
-    if not data:
+    if not written:
         print("No data quality issues found.")
     else:
-        df = pd.DataFrame(data)
-        output_file = "data_quality_issues_report_fixed.xlsx"
-        df.to_excel(output_file, index=False)
-        print(f"\n✅ Excel report generated successfully: {output_file}")
+        print(f"\n✅ Report generated successfully: {args.output} ({written} rows)")
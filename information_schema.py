@@ -1,10 +1,7 @@
 # find_customer_tables_UAT.py
-from db_connector import get_connection
-import csv
-
-# Connect using external connector file
-conn = get_connection()
-cursor = conn.cursor()
+import sys
+from schema_catalog import SchemaCatalog
+from report_writer import open_report
 
 # Keywords indicating customer-related fields
 keywords = ["name", "customer", "phone", "mobile", "contact", "address", "email"]
@@ -12,39 +9,21 @@ keywords = ["name", "customer", "phone", "mobile", "contact", "address", "email"
 # Only check UAT schema
 db_name = "UAT"
 
-# Build SQL query using GROUP_CONCAT (MySQL)
-query = """
-SELECT 
-    table_schema, 
-    table_name, 
-    GROUP_CONCAT(column_name ORDER BY column_name SEPARATOR ', ') AS columns
-FROM information_schema.columns
-WHERE table_schema = %s
-AND ({})
-GROUP BY table_schema, table_name
-ORDER BY table_name;
-""".format(" OR ".join([f"LOWER(column_name) LIKE '%{kw}%'" for kw in keywords]))
-
-cursor.execute(query, (db_name,))
-results = cursor.fetchall()
-
-# Prepare data for CSV
-csv_data = []
-for schema, table, columns in results:
-    csv_data.append({
-        "database": schema,
-        "table_name": table,
-        "columns": columns
-    })
-
-# Write to CSV
-csv_file = "customer_tables_UAT.csv"
-with open(csv_file, mode='w', newline='', encoding='utf-8') as f:
-    writer = csv.DictWriter(f, fieldnames=["database", "table_name", "columns"])
-    writer.writeheader()
-    writer.writerows(csv_data)
-
-print(f"CSV file '{csv_file}' has been created with {len(csv_data)} rows.")
-
-cursor.close()
-conn.close()
+# Report file (.csv by default; .jsonl, .xlsx, .parquet by extension)
+report_file = sys.argv[1] if len(sys.argv) > 1 else "customer_tables_UAT.csv"
+
+# Table/column metadata comes from the shared schema catalog (one information_schema scan);
+# each matching table is written as soon as it is found
+catalog = SchemaCatalog(schema=db_name)
+writer = open_report(report_file, ["database", "table_name", "columns"])
+row_count = 0
+try:
+    for table_name, table in sorted(catalog.tables().items()):
+        matches = sorted(c for c in table.column_names if any(kw in c.lower() for kw in keywords))
+        if matches:
+            writer.write_rows([{"database": db_name, "table_name": table_name, "columns": ", ".join(matches)}])
+            row_count += 1
+finally:
+    writer.close()
+
+print(f"Report file '{report_file}' has been created with {row_count} rows.")
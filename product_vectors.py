@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+# --------------------------------------
+# FEATURE WEIGHTS (same emphasis as the rule based score)
+# --------------------------------------
+BRAND_WEIGHT = 3.0
+CATEGORY_WEIGHT = 2.0
+SUB_CATEGORY_WEIGHT = 2.0
+PRICE_WEIGHT = 1.0
+NAME_WEIGHT = 2.0
+
+PRICE_STEP = np.log(1.10)   # one price bucket per 10%
+
+
+def one_hot(codes, weight):
+    """Sparse one-hot block from factorized codes; -1 (NULL) rows stay empty"""
+    rows = np.flatnonzero(codes >= 0)
+    width = int(codes.max()) + 1 if len(rows) else 1
+    data = np.full(len(rows), weight, dtype=np.float32)
+    return sparse.csr_matrix((data, (rows, codes[rows])), shape=(len(codes), width))
+
+
+def price_buckets(prices, weight):
+    # log-price bucket plus half weight on both neighbours, so prices a bucket apart still overlap
+    prices = np.asarray(prices, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        valid = np.flatnonzero(prices > 0)
+    buckets = np.floor(np.log(prices[valid]) / PRICE_STEP).astype(np.int64)
+
+    if len(valid) == 0:
+        return sparse.csr_matrix((len(prices), 1), dtype=np.float32)
+
+    cols = buckets - buckets.min() + 1
+    rows = np.concatenate([valid, valid, valid])
+    cols = np.concatenate([cols, cols - 1, cols + 1])
+    data = np.concatenate([
+        np.full(len(valid), weight, dtype=np.float32),
+        np.full(2 * len(valid), weight / 2, dtype=np.float32),
+    ])
+    return sparse.csr_matrix((data, (rows, cols)), shape=(len(prices), int(cols.max()) + 1))
+
+
+class VectorIndex:
+    """L2-normalised sparse product vectors; a query is one sparse mat-vec over the catalog"""
+
+    def __init__(self, df):
+        names = df["product_name"].astype(object).where(df["product_name"].notna(), "").astype(str)
+        tfidf = TfidfVectorizer(sublinear_tf=True, dtype=np.float32).fit_transform(names)
+
+        blocks = [
+            one_hot(pd.factorize(df["brand_id"])[0], BRAND_WEIGHT),
+            one_hot(pd.factorize(df["mst_category_id"])[0], CATEGORY_WEIGHT),
+            one_hot(pd.factorize(df["sub_category_id"])[0], SUB_CATEGORY_WEIGHT),
+            price_buckets(df["price"].to_numpy(), PRICE_WEIGHT),
+            tfidf * NAME_WEIGHT,
+        ]
+        self.vectors = normalize(sparse.hstack(blocks, format="csr", dtype=np.float32))
+
+    def similarities(self, position):
+        """Cosine similarity of every product to the product at `position`"""
+        return (self.vectors @ self.vectors[position].T).toarray().ravel()
@@ -0,0 +1,100 @@
+import json
+import sqlite3
+import datetime
+
+# --------------------------------------
+# PER-TABLE PROFILING STATE (SQLite)
+# --------------------------------------
+DEFAULT_STATE_FILE = "profile_state.sqlite"
+
+
+class ProfileState:
+    """Last results and change fingerprint of every profiled table"""
+
+    def __init__(self, path=DEFAULT_STATE_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS table_state (
+                schema_name TEXT NOT NULL,
+                table_name TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                profiled_at TEXT NOT NULL,
+                results TEXT NOT NULL,
+                PRIMARY KEY (schema_name, table_name)
+            )
+        """)
+        self.conn.commit()
+
+    def load(self):
+        """{(schema, table): {"fingerprint", "profiled_at", "results"}}"""
+        rows = self.conn.execute(
+            "SELECT schema_name, table_name, fingerprint, profiled_at, results FROM table_state"
+        )
+        return {
+            (schema, table): {
+                "fingerprint": fingerprint,
+                "profiled_at": profiled_at,
+                "results": json.loads(results),
+            }
+            for schema, table, fingerprint, profiled_at, results in rows
+        }
+
+    def save(self, schema, table, fingerprint, results):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO table_state VALUES (?, ?, ?, ?, ?)",
+            (schema, table, fingerprint, datetime.datetime.now().isoformat(timespec="seconds"),
+             json.dumps(results, default=str)),
+        )
+        self.conn.commit()
+
+    def forget_missing(self, tables):
+        """Drop state for tables that no longer exist"""
+        for schema, table in set(self.load()) - set(tables):
+            self.conn.execute(
+                "DELETE FROM table_state WHERE schema_name = ? AND table_name = ?", (schema, table)
+            )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def make_fingerprint(update_time, max_id, columns, mode):
+    """None when the table can't be proven unchanged (InnoDB forgets UPDATE_TIME on restart)"""
+    if update_time is None:
+        return None
+    return json.dumps({
+        "update_time": str(update_time),
+        "max_id": max_id,
+        "columns": [list(c) for c in columns],
+        "mode": mode,
+    })
+
+
+# --------------------------------------
+# CHANGES SINCE THE LAST RUN
+# --------------------------------------
+def diff_results(previous, current):
+    """Tag current issues NEW / CHANGED / UNCHANGED and add RESOLVED rows for issues that went away"""
+    before = {(r["Schema"], r["Table"], r["Column"]): r for r in previous}
+    after = set()
+    tagged = []
+
+    for row in current:
+        key = (row["Schema"], row["Table"], row["Column"])
+        after.add(key)
+        old = before.get(key)
+        if old is None:
+            change = "NEW"
+        elif old["Status"] != row["Status"]:
+            change = f"CHANGED (was {old['Status']})"
+        else:
+            change = "UNCHANGED"
+        tagged.append(dict(row, **{"Change Since Last Run": change}))
+
+    for key, old in before.items():
+        if key not in after:
+            tagged.append(dict(old, **{"Change Since Last Run": "RESOLVED"}))
+
+    return tagged
@@ -0,0 +1,126 @@
+import os
+import csv
+import json
+import datetime
+import decimal
+from openpyxl import Workbook
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:     # Parquet output is optional; CSV / JSONL / Excel always work
+    pa = None
+
+# --------------------------------------
+# STREAMING REPORT WRITERS
+# --------------------------------------
+# Rows are appended as each table finishes. CSV and JSONL are flushed after every
+# write, so a crashed run keeps everything written so far. Parquet and Excel only
+# become readable on close(), but neither keeps the rows in Python memory.
+
+
+def plain_value(value):
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return value
+
+
+class CsvReportWriter:
+    def __init__(self, path, columns, types=None):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=columns, extrasaction="ignore")
+        self.writer.writeheader()
+
+    def write_rows(self, rows):
+        self.writer.writerows({col: plain_value(value) for col, value in row.items()} for row in rows)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlReportWriter:
+    def __init__(self, path, columns, types=None):
+        self.file = open(path, "w", encoding="utf-8")
+        self.columns = columns
+
+    def write_rows(self, rows):
+        for row in rows:
+            record = {col: plain_value(row.get(col)) for col in self.columns}
+            self.file.write(json.dumps(record, default=str) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ExcelReportWriter:
+    """openpyxl write-only workbook: rows go straight to the zip stream, constant memory"""
+
+    def __init__(self, path, columns, types=None):
+        self.path = path
+        self.columns = columns
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet()
+        self.sheet.append(columns)
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.sheet.append([plain_value(row.get(col)) for col in self.columns])
+
+    def close(self):
+        self.workbook.save(self.path)
+
+
+class ParquetReportWriter:
+    """One row group per write_rows() call"""
+
+    ARROW_TYPES = {"int": "int64", "float": "float64", "bool": "bool_"}
+
+    def __init__(self, path, columns, types=None):
+        if pa is None:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)")
+
+        types = types or {}
+        self.columns = columns
+        self.kinds = {col: types.get(col, "str") for col in columns}
+        self.schema = pa.schema([
+            (col, getattr(pa, self.ARROW_TYPES[kind])() if kind in self.ARROW_TYPES else pa.string())
+            for col, kind in self.kinds.items()
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def cell(self, value, kind):
+        value = plain_value(value)
+        if value is None or kind != "str":
+            return value
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        return str(value)
+
+    def write_rows(self, rows):
+        if not rows:
+            return
+        data = {col: [self.cell(row.get(col), self.kinds[col]) for row in rows] for col in self.columns}
+        self.writer.write_table(pa.Table.from_pydict(data, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {
+    ".csv": CsvReportWriter,
+    ".jsonl": JsonlReportWriter,
+    ".xlsx": ExcelReportWriter,
+    ".parquet": ParquetReportWriter,
+}
+
+
+def open_report(path, columns, types=None):
+    """Pick the writer from the file extension (.csv, .jsonl, .xlsx, .parquet)"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in WRITERS:
+        raise ValueError(f"Unsupported report format '{ext}', use one of {', '.join(WRITERS)}")
+    return WRITERS[ext](path, columns, types)
@@ -0,0 +1,118 @@
+import time
+import threading
+from collections import namedtuple
+from db_connector import get_connection, load_config
+
+# --------------------------------------
+# TABLE / COLUMN METADATA
+# --------------------------------------
+Column = namedtuple("Column", ["name", "data_type", "column_type", "nullable", "key", "extra"])
+
+
+class TableInfo:
+    def __init__(self, name):
+        self.name = name
+        self.columns = []           # in ordinal order
+        self.primary_key = []       # column names, in key order
+
+    @property
+    def column_names(self):
+        return [c.name for c in self.columns]
+
+    def column(self, name):
+        for c in self.columns:
+            if c.name == name:
+                return c
+        return None
+
+    def unknown_columns(self, names):
+        """Identifier whitelist: every name that is not a real column of this table"""
+        known = set(self.column_names)
+        return [n for n in names if n not in known]
+
+
+# --------------------------------------
+# CACHED SCHEMA CATALOG
+# --------------------------------------
+class SchemaCatalog:
+    """All tables and columns of one schema, loaded in two queries and kept for `ttl` seconds"""
+
+    MISS_RELOAD_INTERVAL = 5    # unknown table: reload at most this often (tables created elsewhere)
+
+    def __init__(self, ttl=300, schema=None):
+        self.ttl = ttl
+        self.schema = schema    # None = the connection's DATABASE()
+        self._tables = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            schema_filter = "table_schema = %s" if self.schema else "table_schema = DATABASE()"
+            params = (self.schema,) if self.schema else ()
+
+            cursor.execute(f"""
+                SELECT table_name, column_name, data_type, column_type, is_nullable, column_key, extra
+                FROM information_schema.columns
+                WHERE {schema_filter}
+                ORDER BY table_name, ordinal_position
+            """, params)
+
+            tables = {}
+            for table, name, data_type, column_type, nullable, key, extra in cursor.fetchall():
+                info = tables.setdefault(table, TableInfo(table))
+                info.columns.append(Column(name, data_type, column_type, nullable == "YES", key, extra))
+
+            cursor.execute(f"""
+                SELECT table_name, column_name
+                FROM information_schema.key_column_usage
+                WHERE {schema_filter}
+                  AND constraint_name = 'PRIMARY'
+                ORDER BY table_name, ordinal_position
+            """, params)
+            for table, name in cursor.fetchall():
+                if table in tables:
+                    tables[table].primary_key.append(name)
+
+            return tables
+        finally:
+            cursor.close()
+            conn.close()
+
+    def tables(self):
+        """{table_name: TableInfo}, reloaded once the TTL has passed"""
+        with self._lock:
+            if self._tables is None or time.monotonic() - self._loaded_at > self.ttl:
+                self._tables = self._load()
+                self._loaded_at = time.monotonic()
+            return self._tables
+
+    def get_table(self, name):
+        """TableInfo for a real table, or None; doubles as the table-name whitelist"""
+        info = self.tables().get(name)
+        if info is None:
+            with self._lock:
+                if self._tables is None or time.monotonic() - self._loaded_at > self.MISS_RELOAD_INTERVAL:
+                    self._tables = self._load()
+                    self._loaded_at = time.monotonic()
+                info = self._tables.get(name)
+        return info
+
+    def invalidate(self):
+        """Forget everything; call after DDL (CREATE / ALTER / DROP TABLE)"""
+        with self._lock:
+            self._tables = None
+
+
+_config = load_config()
+schema_catalog = SchemaCatalog(ttl=_config.getint('schema', 'cache_ttl', fallback=300))
+
+
+def get_table(name):
+    return schema_catalog.get_table(name)
+
+
+def invalidate_schema():
+    schema_catalog.invalidate()
@@ -1,23 +1,148 @@
 from flask import Flask, jsonify, request
+import os
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
-from db_connector import get_connection
+from db_connector import get_connection, load_config
+from fast_response import json_response
+import catalog_snapshot
 
 app = Flask(__name__)
 
 # --------------------------------------
 # GLOBAL CACHE
 # --------------------------------------
-products_df = None
+catalog = None      # current Catalog snapshot, swapped as a whole on reload
+
+# Columns with a sorted index (row positions ordered by value)
+INDEXED_COLUMNS = ["product_id", "brand_id", "sub_category_id", "mst_category_id", "price"]
+EMPTY = np.array([], dtype=np.intp)
 
 
 # --------------------------------------
-# LOAD DATA ON STARTUP
+# RECOMMENDATION CACHE
 # --------------------------------------
-def load_data():
-    global products_df
-    engine = get_connection()
+class RecommendationCache:
+    """LRU + TTL cache of get_recommendations results, emptied whenever the catalog reloads"""
+
+    def __init__(self, max_size=10000, ttl=600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value, generation):
+        with self._lock:
+            # Result computed against a catalog that has since been replaced
+            if generation != self.generation:
+                return
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop everything and return the keys, most recently used first"""
+        with self._lock:
+            keys = list(reversed(self._data))
+            self._data.clear()
+            self.generation += 1
+            return keys
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+_config = load_config()
+recommendation_cache = RecommendationCache(
+    max_size=_config.getint('recommendations', 'cache_size', fallback=10000),
+    ttl=_config.getint('recommendations', 'cache_ttl', fallback=600),
+)
+WARMUP_TOP_N = _config.getint('recommendations', 'warmup_top_n', fallback=1000)
+WARMUP_PRODUCT_IDS = [
+    int(pid) for pid in _config.get('recommendations', 'warmup_product_ids', fallback='').split(",")
+    if pid.strip()
+]
+
+# Rows with this column above the last seen value are pulled on an incremental refresh
+WATERMARK_COLUMN = _config.get('recommendations', 'watermark_column', fallback='pd.id')
+REFRESH_INTERVAL = _config.getint('recommendations', 'refresh_interval', fallback=300)
+FULL_RELOAD_INTERVAL = _config.getint('recommendations', 'full_reload_interval', fallback=3600)
+RETRY_INTERVAL = 30
+
+# mode=vector: TF-IDF / one-hot product vectors built with every catalog
+VECTOR_INDEX = _config.getboolean('recommendations', 'vector_index', fallback=False)
+
+# Shared memory-mapped snapshot for all worker processes; empty disables it
+SNAPSHOT_DIR = _config.get('recommendations', 'snapshot_dir', fallback='')
+if SNAPSHOT_DIR:
+    SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), SNAPSHOT_DIR)
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+
+
+class Catalog:
+    """One immutable catalog snapshot: the compact frame, its indexes and the watermark it was read up to"""
+
+    def __init__(self, df, watermark, full_loaded_at, loaded_at=None, source=None):
+        self.df = df
+        self.indexes = build_indexes(df)
+        self.watermark = watermark
+        self.full_loaded_at = full_loaded_at
+        self.loaded_at = loaded_at or time.time()
+        self.source = source    # snapshot name when mapped from disk
+        self.vectors = build_vectors(df) if VECTOR_INDEX else None
+
+
+def build_vectors(df):
+    try:
+        import product_vectors
+    except ImportError as e:
+        print("Vector index disabled:", e)
+        return None
+    started = time.perf_counter()
+    try:
+        vectors = product_vectors.VectorIndex(df)
+    except Exception as e:
+        # e.g. TF-IDF "empty vocabulary" on an empty catalog; the rules engine must still load
+        print("Vector index build failed, vector mode disabled:", e)
+        return None
+    print(f"Vector index built in {time.perf_counter() - started:.2f}s")
+    return vectors
 
-    query = """
+
+# --------------------------------------
+# LOAD DATA
+# --------------------------------------
+CATALOG_QUERY = f"""
     SELECT
         pd.id AS product_id,
         pd.product_name,
@@ -36,7 +161,9 @@ def load_data():
 
         pp.price,
         pp.mrp,
-        pp.discount
+        pp.discount,
+
+        {WATERMARK_COLUMN} AS change_marker
 
     FROM UAT.product_detail pd
     LEFT JOIN UAT.brand b ON pd.brand_id = b.id
@@ -45,11 +172,97 @@ def load_data():
     LEFT JOIN UAT.product_pricing pp ON pd.id = pp.product_id
     """
 
-    products_df = pd.read_sql(query, engine)
-    print("Products loaded:", len(products_df))
+_reload_lock = threading.Lock()
+
+
+def fetch_products(since=None):
+    engine = get_connection()
+    try:
+        if since is None:
+            return pd.read_sql(CATALOG_QUERY, engine)
+        # numpy / pandas scalars -> plain Python values the driver can bind
+        if isinstance(since, pd.Timestamp):
+            since = since.to_pydatetime()
+        elif isinstance(since, np.generic):
+            since = since.item()
+        return pd.read_sql(CATALOG_QUERY + f" WHERE {WATERMARK_COLUMN} > %s", engine, params=(since,))
+    finally:
+        engine.close()
+
+
+def swap_catalog(new_catalog):
+    global catalog
+    catalog = new_catalog   # single assignment: requests see the old or the new snapshot, never a mix
+    print("Products loaded:", len(new_catalog.df))
+
+    # Old results describe the old catalog; hand back the hottest keys so callers can re-warm them
+    return recommendation_cache.clear()[:WARMUP_TOP_N]
+
+
+def load_data(full=True):
+    """Build a new Catalog from MySQL off the request path and swap it in; returns invalidated hot keys"""
+    with _reload_lock:
+        current = catalog
+
+        if full or current is None or current.watermark is None:
+            df = fetch_products()
+            watermark = df["change_marker"].max() if len(df) else None
+            full_loaded_at = time.time()
+        else:
+            changed = fetch_products(since=current.watermark)
+            if changed.empty:
+                return []
+            # Changed products replace every row they had before
+            kept = current.df[~current.df["product_id"].isin(changed["product_id"].unique())]
+            watermark = changed["change_marker"].max()
+            df = pd.concat([kept, changed], ignore_index=True)
+            full_loaded_at = current.full_loaded_at
+            print("Products changed:", changed["product_id"].nunique())
+
+        df = catalog_snapshot.compact_frame(df.drop(columns="change_marker"))
+        new_catalog = Catalog(df, watermark, full_loaded_at)
+
+        if SNAPSHOT_DIR:
+            new_catalog.source = catalog_snapshot.save_snapshot(SNAPSHOT_DIR, df, {
+                "watermark": catalog_snapshot.encode_value(watermark),
+                "full_loaded_at": full_loaded_at,
+                "loaded_at": new_catalog.loaded_at,
+            })
+
+        return swap_catalog(new_catalog)
+
+
+def adopt_snapshot(max_age=None):
+    """Map the published snapshot if it is newer than ours; returns invalidated hot keys or None"""
+    name, meta = catalog_snapshot.read_current(SNAPSHOT_DIR)
+    if name is None:
+        return None
+
+    current = catalog
+    if current is not None and (current.source == name or meta["loaded_at"] <= current.loaded_at):
+        return None
+    if max_age is not None and time.time() - meta["loaded_at"] > max_age:
+        return None
+
+    df = catalog_snapshot.open_snapshot(SNAPSHOT_DIR, name, meta)
+    return swap_catalog(Catalog(
+        df,
+        catalog_snapshot.decode_value(meta["watermark"]),
+        meta["full_loaded_at"],
+        loaded_at=meta["loaded_at"],
+        source=name,
+    ))
+
 
+def build_indexes(df):
+    """Row positions sorted by value per column, so a lookup is two binary searches"""
+    built = {}
+    for col in INDEXED_COLUMNS:
+        values = df[col].to_numpy()
+        order = np.argsort(values, kind="stable")     # NaN sorts last, equal values keep catalog order
+        built[col] = (order, values[order])
+    return built
 
-load_data()
 
 # --------------------------------------
 # SIMILARITY LOGIC
@@ -74,72 +287,407 @@ def calculate_similarity(p1, p2):
 
 
 # --------------------------------------
-# CORE RECOMMENDATION FUNCTION
+# CANDIDATE GENERATION
 # --------------------------------------
-def get_recommendations(product_id, similar_limit=5, other_limit=10):
-    base_df = products_df[products_df["product_id"] == product_id]
+def lookup(snapshot, column, value):
+    if pd.isna(value):
+        # NULL never matches anything
+        return EMPTY
+    order, sorted_values = snapshot.indexes[column]
+    start = np.searchsorted(sorted_values, value, side="left")
+    end = np.searchsorted(sorted_values, value, side="right")
+    return order[start:end]
 
-    if base_df.empty:
-        return None
 
-    base_product = base_df.iloc[0]
-    similar = []
-    others = []
+def price_candidates(snapshot, base_price):
+    # Superset of rows within 10% of base_price; exact check happens in score_products
+    if not base_price or np.isnan(base_price):
+        return EMPTY
 
-    for _, row in products_df.iterrows():
-        if row["product_id"] == product_id:
-            continue
+    order, sorted_prices = snapshot.indexes["price"]
 
-        score = calculate_similarity(base_product, row)
-
-        product_card = {
-            "product_id": int(row["product_id"]),
-            "product_name": row["product_name"],
-            "brand_name": row["brand_name"],
-            "category_name": row["category_name"],
-            "sub_category_name": row["sub_category_name"],
-            "price": float(row["price"] or 0),
-            "mrp": float(row["mrp"] or 0),
-            "discount": float(row["discount"] or 0),
-            "similarity_score": score
-        }
-
-        if score > 0:
-            similar.append(product_card)
-        else:
-            others.append(product_card)
+    if base_price < 0:
+        return order[:np.count_nonzero(~np.isnan(sorted_prices))]
+
+    low = base_price * 0.9 * (1 - 1e-9)
+    high = base_price * 1.1 * (1 + 1e-9)
+    start = np.searchsorted(sorted_prices, low, side="left")
+    end = np.searchsorted(sorted_prices, high, side="right")
+    return order[start:end]
 
-    # Sort similar products by score
-    similar.sort(key=lambda x: x["similarity_score"], reverse=True)
+
+def get_candidates(snapshot, base_product):
+    """Every row that can score > 0 shares a brand/category/sub-category or is near in price"""
+    return np.unique(np.concatenate([
+        lookup(snapshot, "brand_id", base_product["brand_id"]),
+        lookup(snapshot, "sub_category_id", base_product["sub_category_id"]),
+        lookup(snapshot, "mst_category_id", base_product["mst_category_id"]),
+        price_candidates(snapshot, float(base_product["price"]) if base_product["price"] is not None else 0.0),
+    ]))
+
+
+def first_unscored(total, excluded, limit):
+    """First `limit` catalog positions not in `excluded`, in catalog order"""
+    if limit < 0:
+        return np.setdiff1d(np.arange(total), excluded)[:limit]
+
+    window = np.arange(min(total, limit + len(excluded)))
+    return window[~np.isin(window, excluded)][:limit]
+
+
+# --------------------------------------
+# VECTORIZED SCORING
+# --------------------------------------
+SIMILARITY_WEIGHTS = (("mst_category_id", 2), ("sub_category_id", 2), ("brand_id", 3))
+
+
+def score_matrix(df, base_positions, positions):
+    """Same rules as calculate_similarity: one row of scores per base row, one column per candidate"""
+    scores = np.zeros((len(base_positions), len(positions)), dtype=np.int8)
+
+    for col, weight in SIMILARITY_WEIGHTS:
+        values = df[col].to_numpy()
+        scores += weight * (values[base_positions][:, None] == values[positions][None, :])
+
+    prices = df["price"].to_numpy()
+    base_prices = prices[base_positions].astype(float)[:, None]
+    candidate_prices = prices[positions].astype(float)[None, :]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        close = ((base_prices != 0) & (candidate_prices != 0)
+                 & (np.abs(candidate_prices - base_prices) / base_prices <= 0.10))
+    scores += close
+
+    return scores
+
+
+def top_k(positions, scores, k):
+    """Highest-scoring positions and their scores, ties kept in catalog order (same as a stable sort)"""
+    if 0 <= k < len(positions):
+        if k == 0:
+            return positions[:0], scores[:0]
+        # argpartition finds the k-th best score without sorting everything
+        kth = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:k - len(above)]
+        keep = np.sort(np.concatenate([above, ties]))
+        positions, scores = positions[keep], scores[keep]
+
+    order = np.argsort(-scores, kind="stable")
+    return positions[order][:k], scores[order][:k]
+
+
+def text(value):
+    # missing categorical values come back as NaN
+    return None if pd.isna(value) else value
+
+
+def money(value):
+    # prices are float64 (DECIMAL from MySQL), sent as-is like float(Decimal) was; missing -> 0
+    if pd.isna(value):
+        return 0.0
+    return float(value)
+
+
+def product_card(row, score):
+    return {
+        "product_id": int(row["product_id"]),
+        "product_name": text(row["product_name"]),
+        "brand_name": text(row["brand_name"]),
+        "category_name": text(row["category_name"]),
+        "sub_category_name": text(row["sub_category_name"]),
+        "price": money(row["price"]),
+        "mrp": money(row["mrp"]),
+        "discount": money(row["discount"]),
+        "similarity_score": score
+    }
+
+
+# --------------------------------------
+# CORE RECOMMENDATION FUNCTION
+# --------------------------------------
+def build_result(snapshot, self_pos, candidates, scores, similar_limit, other_limit, score_format=int):
+    products_df = snapshot.df
+    base_product = products_df.iloc[self_pos[0]]
+
+    not_self = ~np.isin(candidates, self_pos)
+    candidates, scores = candidates[not_self], scores[not_self]
+
+    matched = scores > 0
+    similar_pos, similar_scores = top_k(candidates[matched], scores[matched], similar_limit)
+    other_pos = first_unscored(len(products_df), np.union1d(candidates[matched], self_pos), other_limit)
+
+    # Only the rows we return are turned into dicts
+    similar = [
+        product_card(products_df.iloc[i], score_format(score))
+        for i, score in zip(similar_pos, similar_scores)
+    ]
+    others = [
+        product_card(products_df.iloc[i], score_format(0))
+        for i in other_pos
+    ]
 
     return {
         "base_product": {
             "product_id": int(base_product["product_id"]),
-            "product_name": base_product["product_name"],
-            "brand_name": base_product["brand_name"],
-            "category_name": base_product["category_name"],
-            "sub_category_name": base_product["sub_category_name"],
-            "price": float(base_product["price"] or 0),
+            "product_name": text(base_product["product_name"]),
+            "brand_name": text(base_product["brand_name"]),
+            "category_name": text(base_product["category_name"]),
+            "sub_category_name": text(base_product["sub_category_name"]),
+            "price": money(base_product["price"]),
         },
-        "similar_products": similar[:similar_limit],
-        "other_products": others[:other_limit]
+        "similar_products": similar,
+        "other_products": others
     }
 
 
+def get_recommendations(product_id, similar_limit=5, other_limit=10):
+    snapshot = catalog
+    self_pos = lookup(snapshot, "product_id", product_id)
+
+    if len(self_pos) == 0:
+        return None
+
+    # Only rows that share something with the base product are scored
+    candidates = get_candidates(snapshot, snapshot.df.iloc[self_pos[0]])
+    scores = score_matrix(snapshot.df, self_pos[:1], candidates)[0]
+
+    return build_result(snapshot, self_pos, candidates, scores, similar_limit, other_limit)
+
+
+def get_vector_recommendations(product_id, similar_limit=5, other_limit=10):
+    """Nearest products by cosine similarity of their feature vectors"""
+    snapshot = catalog
+    if snapshot.vectors is None:
+        # vector build failed on the last reload (or the catalog swapped under the request)
+        return None
+
+    self_pos = lookup(snapshot, "product_id", product_id)
+
+    if len(self_pos) == 0:
+        return None
+
+    similarities = snapshot.vectors.similarities(self_pos[0])
+    candidates = np.flatnonzero(similarities > 0)
+
+    return build_result(snapshot, self_pos, candidates, similarities[candidates],
+                        similar_limit, other_limit, score_format=lambda s: round(float(s), 4))
+
+
+BATCH_MAX_IDS = 100         # product ids accepted per batch request
+BATCH_SCORE_ROWS = 16       # base products scored together in one matrix
+
+
+def get_recommendations_batch(product_ids, similar_limit=5, other_limit=10):
+    """Recommendations for many products; uncached ones share one candidate set and score matrix per chunk"""
+    snapshot = catalog
+    df = snapshot.df
+    results = {}
+    pending = []
+
+    generation = recommendation_cache.generation
+    for product_id in dict.fromkeys(product_ids):
+        found, data = recommendation_cache.get((product_id, similar_limit, other_limit, "rules"))
+        if found:
+            results[product_id] = data
+            continue
+
+        self_pos = lookup(snapshot, "product_id", product_id)
+        if len(self_pos) == 0:
+            results[product_id] = None
+            recommendation_cache.put((product_id, similar_limit, other_limit, "rules"), None, generation)
+        else:
+            pending.append((product_id, self_pos))
+
+    # Products in the same category / brand land in the same chunk and share most candidates
+    mst = df["mst_category_id"].to_numpy()
+    brand = df["brand_id"].to_numpy()
+    pending.sort(key=lambda item: (str(mst[item[1][0]]), str(brand[item[1][0]])))
+
+    for start in range(0, len(pending), BATCH_SCORE_ROWS):
+        chunk = pending[start:start + BATCH_SCORE_ROWS]
+        base_positions = np.array([self_pos[0] for _, self_pos in chunk])
+
+        candidates = np.unique(np.concatenate([
+            get_candidates(snapshot, df.iloc[position]) for position in base_positions
+        ]))
+        matrix = score_matrix(df, base_positions, candidates)
+
+        for (product_id, self_pos), scores in zip(chunk, matrix):
+            data = build_result(snapshot, self_pos, candidates, scores, similar_limit, other_limit)
+            results[product_id] = data
+            recommendation_cache.put((product_id, similar_limit, other_limit, "rules"), data, generation)
+
+    return results
+
+
+RECOMMENDERS = {
+    "rules": get_recommendations,
+    "vector": get_vector_recommendations,
+}
+
+
+def get_recommendations_cached(product_id, similar_limit=5, other_limit=10, mode="rules"):
+    key = (product_id, similar_limit, other_limit, mode)
+    found, data = recommendation_cache.get(key)
+    if found:
+        return data
+
+    generation = recommendation_cache.generation
+    data = RECOMMENDERS[mode](product_id, similar_limit, other_limit)
+    recommendation_cache.put(key, data, generation)
+    return data
+
+
+def warm_cache(keys):
+    if catalog.vectors is None:
+        # no vector index in this snapshot; those keys are answered 400 until it comes back
+        keys = [key for key in keys if key[3] != "vector"]
+    for key in keys:
+        get_recommendations_cached(*key)
+    if keys:
+        print("Recommendation cache warmed:", len(keys))
+
+
+# --------------------------------------
+# BACKGROUND REFRESHER
+# --------------------------------------
+_reload_requested = threading.Event()
+_full_reload_requested = False
+refresh_status = {"last_refresh": None, "last_full_reload": None, "last_error": None}
+
+
+def request_reload(full=False):
+    global _full_reload_requested
+    _full_reload_requested = _full_reload_requested or full
+    _reload_requested.set()
+
+
+def refresh_catalog(first_load, forced_full):
+    """One refresh round; returns the invalidated hot keys, or None when nothing changed hands"""
+    full = (first_load or forced_full
+            or time.time() - catalog.full_loaded_at >= FULL_RELOAD_INTERVAL)
+
+    if not SNAPSHOT_DIR:
+        return load_data(full)
+
+    # Another worker may already have refreshed: mapping its snapshot costs no query
+    if not forced_full:
+        hot_keys = adopt_snapshot(max_age=None if first_load else REFRESH_INTERVAL)
+        if hot_keys is not None:
+            return hot_keys
+
+    with catalog_snapshot.refresh_lock(SNAPSHOT_DIR) as owner:
+        if owner or first_load:
+            return load_data(full)
+    return None
+
+
+def refresher():
+    """Initial load, then incremental refreshes plus a periodic full reload (catches deletes)"""
+    global _full_reload_requested
+
+    while True:
+        forced_full = _full_reload_requested
+        _full_reload_requested = False
+
+        try:
+            first_load = catalog is None
+            hot_keys = refresh_catalog(first_load, forced_full)
+            if hot_keys is not None:
+                warm_cache(hot_keys)
+                refresh_status["last_refresh"] = time.time()
+            if first_load:
+                warm_cache([(pid, 5, 10) for pid in WARMUP_PRODUCT_IDS[:WARMUP_TOP_N]])
+            refresh_status["last_full_reload"] = catalog.full_loaded_at if catalog else None
+            refresh_status["last_error"] = None
+        except Exception as e:
+            print("Catalog refresh failed:", e)
+            refresh_status["last_error"] = str(e)
+
+        _reload_requested.wait(REFRESH_INTERVAL if catalog is not None else RETRY_INTERVAL)
+        _reload_requested.clear()
+
+
+# Started on the first request, not at import: a thread started before gunicorn --preload
+# forks does not exist in the workers. Requests get 503 until the first load lands.
+_refresher_pid = None
+_refresher_lock = threading.Lock()
+
+
+def start_refresher():
+    global _refresher_pid
+    if _refresher_pid == os.getpid():
+        return
+    with _refresher_lock:
+        if _refresher_pid != os.getpid():
+            threading.Thread(target=refresher, name="catalog-refresher", daemon=True).start()
+            _refresher_pid = os.getpid()
+
+
+@app.before_request
+def ensure_refresher():
+    start_refresher()
+
+
 # --------------------------------------
 # API ENDPOINT
 # --------------------------------------
+#http://127.0.0.1:5000/recommendations/101?mode=vector for the feature-vector engine
 @app.route("/recommendations/<int:product_id>")
 def recommendations(product_id):
     similar_limit = int(request.args.get("similar", 5))
     other_limit = int(request.args.get("other", 10))
+    mode = request.args.get("mode", "rules")
+
+    if mode not in RECOMMENDERS:
+        return jsonify({"error": f"mode must be one of {list(RECOMMENDERS)}"}), 400
 
-    data = get_recommendations(product_id, similar_limit, other_limit)
+    if catalog is None:
+        return jsonify({"error": "Catalog is still loading"}), 503
+
+    if mode == "vector" and catalog.vectors is None:
+        return jsonify({"error": "Vector index is not enabled"}), 400
+
+    started = time.perf_counter()
+    data = get_recommendations_cached(product_id, similar_limit, other_limit, mode)
+    elapsed_ms = (time.perf_counter() - started) * 1000
 
     if not data:
         return jsonify({"error": "Product not found"}), 404
 
-    return jsonify(data)
+    response = json_response(data)
+    # lets us compare the engines' latency from the client side
+    response.headers["Server-Timing"] = f"{mode};dur={elapsed_ms:.2f}"
+    return response
+
+
+#POST http://127.0.0.1:5000/recommendations/batch with raw json {"product_ids": [101, 102], "similar": 5, "other": 10}
+@app.route("/recommendations/batch", methods=["POST"])
+def recommendations_batch():
+    if catalog is None:
+        return jsonify({"error": "Catalog is still loading"}), 503
+
+    data = request.get_json(silent=True) or {}
+    product_ids = data.get("product_ids")
+
+    if not isinstance(product_ids, list) or not product_ids:
+        return jsonify({"error": "product_ids must be a non-empty list"}), 400
+    if len(product_ids) > BATCH_MAX_IDS:
+        return jsonify({"error": f"At most {BATCH_MAX_IDS} product_ids per request"}), 400
+
+    try:
+        product_ids = [int(pid) for pid in product_ids]
+        similar_limit = int(data.get("similar", 5))
+        other_limit = int(data.get("other", 10))
+    except (TypeError, ValueError):
+        return jsonify({"error": "product_ids, similar and other must be integers"}), 400
+
+    results = get_recommendations_batch(product_ids, similar_limit, other_limit)
+
+    return json_response({
+        "results": {str(pid): results[pid] for pid in results if results[pid]},
+        "not_found": [pid for pid in results if not results[pid]]
+    })
 
 
 # --------------------------------------
@@ -147,12 +695,32 @@ def recommendations(product_id):
 # --------------------------------------
 @app.route("/health")
 def health():
+    snapshot = catalog
     return jsonify({
-        "status": "ok",
-        "rows_loaded": len(products_df)
+        "status": "ok" if snapshot is not None else "loading",
+        "rows_loaded": len(snapshot.df) if snapshot is not None else 0,
+        "catalog_loaded_at": snapshot.loaded_at if snapshot is not None else None,
+        "catalog_snapshot": snapshot.source if snapshot is not None else None,
+        "catalog_bytes": int(snapshot.df.memory_usage().sum()) if snapshot is not None else 0,
+        "refresh": refresh_status,
+        "cache": recommendation_cache.stats()
     })
 
 
+# --------------------------------------
+# ADMIN
+# --------------------------------------
+#POST http://127.0.0.1:5000/admin/reload?full=1 to rebuild the catalog now
+@app.route("/admin/reload", methods=["POST"])
+def admin_reload():
+    full = request.args.get("full", "0").lower() in ("1", "true", "yes")
+    request_reload(full)
+    return jsonify({
+        "status": "reload scheduled",
+        "full": full
+    }), 202
+
+
 # --------------------------------------
 # RUN APP
 # --------------------------------------
@@ -0,0 +1,88 @@
+import gc
+import mysql.connector
+import pytest
+
+import db_connector
+
+
+class FakeConnection:
+    """Just enough of a mysql connection for the pool's bookkeeping"""
+
+    def __init__(self):
+        self.unread_result = False
+        self.in_transaction = False
+        self.closed = False
+
+    def is_connected(self):
+        return not self.closed
+
+    def cursor(self, **kwargs):
+        return object()
+
+    def rollback(self):
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(db_connector.mysql.connector, "connect", lambda **kwargs: FakeConnection())
+    return db_connector.ConnectionPool({}, min_size=1, max_size=2, checkout_timeout=1)
+
+
+def test_each_checkout_gets_a_new_handle(pool):
+    first = pool.acquire()
+    raw = first._raw
+    first.close()
+
+    second = pool.acquire()
+    assert second is not first
+    assert second._raw is raw
+
+
+def test_stale_handle_cannot_release_or_use_anothers_connection(pool):
+    stale = pool.acquire()
+    stale.close()
+    owner = pool.acquire()
+
+    with pytest.raises(mysql.connector.errors.PoolError):
+        stale.close()
+    with pytest.raises(mysql.connector.errors.PoolError):
+        stale.cursor()
+
+    stats = pool.stats()
+    assert stats["in_use"] == 1
+    assert stats["idle"] == 0
+
+    # the owner's connection is still theirs: the next checkout gets a different one
+    other = pool.acquire()
+    assert other._raw is not owner._raw
+
+
+def test_close_inside_with_block(pool):
+    with pool.acquire() as conn:
+        conn.close()
+    assert pool.stats()["in_use"] == 0
+
+
+def test_session_markers_follow_the_connection(pool):
+    conn = pool.acquire()
+    conn.stats_expiry_off = True
+    conn.close()
+
+    assert pool.acquire().stats_expiry_off is True
+
+
+def test_dropped_handle_is_reclaimed(pool):
+    conn = pool.acquire()
+    raw = conn._raw
+    del conn
+    gc.collect()
+
+    pool.acquire().close()
+    stats = pool.stats()
+    assert stats["connections_leaked"] == 1
+    assert stats["in_use"] == 0
+    assert raw.closed
@@ -0,0 +1,171 @@
+import time
+import random
+import numpy as np
+import pandas as pd
+import pytest
+
+import catalog_snapshot
+import similar_packages as sp
+
+
+# --------------------------------------
+# REFERENCE: the original iterrows scorer
+# --------------------------------------
+def reference_similarity(p1, p2):
+    score = 0
+
+    if p1["mst_category_id"] == p2["mst_category_id"]:
+        score += 2
+
+    if p1["sub_category_id"] == p2["sub_category_id"]:
+        score += 2
+
+    if p1["brand_id"] == p2["brand_id"]:
+        score += 3
+
+    if p1["price"] and p2["price"]:
+        if abs(p1["price"] - p2["price"]) / p1["price"] <= 0.10:
+            score += 1
+
+    return score
+
+
+def reference_money(value):
+    # The original sent float(NaN) for a NULL price, which is not valid JSON; the new code sends 0
+    return 0.0 if value is None or pd.isna(value) else float(value)
+
+
+def reference_text(value):
+    return None if value is None or pd.isna(value) else value
+
+
+def reference_card(row, score):
+    return {
+        "product_id": int(row["product_id"]),
+        "product_name": reference_text(row["product_name"]),
+        "brand_name": reference_text(row["brand_name"]),
+        "category_name": reference_text(row["category_name"]),
+        "sub_category_name": reference_text(row["sub_category_name"]),
+        "price": reference_money(row["price"]),
+        "mrp": reference_money(row["mrp"]),
+        "discount": reference_money(row["discount"]),
+        "similarity_score": score
+    }
+
+
+def reference_recommendations(products_df, product_id, similar_limit=5, other_limit=10):
+    base_df = products_df[products_df["product_id"] == product_id]
+
+    if base_df.empty:
+        return None
+
+    base_product = base_df.iloc[0]
+    similar = []
+    others = []
+
+    for _, row in products_df.iterrows():
+        if row["product_id"] == product_id:
+            continue
+
+        score = reference_similarity(base_product, row)
+        if score > 0:
+            similar.append(reference_card(row, score))
+        else:
+            others.append(reference_card(row, score))
+
+    similar.sort(key=lambda x: x["similarity_score"], reverse=True)
+
+    return {
+        "base_product": {
+            "product_id": int(base_product["product_id"]),
+            "product_name": reference_text(base_product["product_name"]),
+            "brand_name": reference_text(base_product["brand_name"]),
+            "category_name": reference_text(base_product["category_name"]),
+            "sub_category_name": reference_text(base_product["sub_category_name"]),
+            "price": reference_money(base_product["price"]),
+        },
+        "similar_products": similar[:similar_limit],
+        "other_products": others[:other_limit]
+    }
+
+
+# --------------------------------------
+# RANDOM CATALOG (shaped like pd.read_sql(CATALOG_QUERY))
+# --------------------------------------
+def random_catalog(rows=400, seed=7):
+    rng = random.Random(seed)
+
+    def maybe_null(value, p=0.05):
+        return None if rng.random() < p else value
+
+    # Hand-picked prices around the 10% boundary, plus random ones; some DECIMALs carry 3 places
+    boundary_prices = [0.30, 0.33, 0.27, 10.0, 11.0, 9.0, 99.99, 109.99, 1234567.89, 12.345, 13.579]
+    records = []
+    for i in range(rows):
+        product_id = rng.randint(1, rows - 20)      # a few ids repeat (one row per pricing row)
+        price = rng.choice(boundary_prices) if rng.random() < 0.3 else round(rng.uniform(0, 500), 2)
+        records.append({
+            "product_id": product_id,
+            "product_name": maybe_null(f"product {product_id}"),
+            "brand_id": maybe_null(rng.randint(1, 12)),
+            "category_id": rng.randint(1, 30),
+            "mst_category_id": maybe_null(rng.randint(1, 6)),
+            "brand_name": maybe_null(f"brand {rng.randint(1, 12)}"),
+            "brand_image": None,
+            "sub_category_id": maybe_null(rng.randint(1, 30)),
+            "sub_category_name": maybe_null(f"sub {rng.randint(1, 30)}"),
+            "category_name": maybe_null(f"cat {rng.randint(1, 6)}"),
+            "category_image": None,
+            "price": maybe_null(rng.choice([0.0, price]) if rng.random() < 0.05 else price),
+            "mrp": maybe_null(round(price * 1.2, 3)),
+            "discount": maybe_null(round(price * 0.2, 4)),
+        })
+
+    # read_sql turns NULL ints into float NaN and DECIMAL into float (coerce_float)
+    df = pd.DataFrame(records)
+    for col in ["brand_id", "mst_category_id", "sub_category_id", "price", "mrp", "discount"]:
+        df[col] = pd.to_numeric(df[col])
+    return df
+
+
+@pytest.fixture(scope="module")
+def reference():
+    """{product_id: full reference result}; the slow iterrows scorer runs once per id"""
+    raw = random_catalog()
+    sp.swap_catalog(sp.Catalog(catalog_snapshot.compact_frame(raw), None, time.time()))
+
+    ids = sorted(raw["product_id"].unique().tolist()) + [10 ** 6]     # plus one unknown id
+    return {product_id: reference_recommendations(raw, product_id, len(raw), len(raw)) for product_id in ids}
+
+
+def limited(result, similar_limit, other_limit):
+    if result is None:
+        return None
+    return dict(result, similar_products=result["similar_products"][:similar_limit],
+                other_products=result["other_products"][:other_limit])
+
+
+@pytest.mark.parametrize("similar_limit, other_limit", [(5, 10), (1000, 1000), (0, 0)])
+def test_rules_scorer_matches_reference(reference, similar_limit, other_limit):
+    for product_id, expected in reference.items():
+        assert sp.get_recommendations(product_id, similar_limit, other_limit) == \
+            limited(expected, similar_limit, other_limit), product_id
+
+
+def test_batch_matches_reference(reference):
+    sp.recommendation_cache.clear()
+    results = sp.get_recommendations_batch(list(reference), 5, 10)
+
+    for product_id, expected in reference.items():
+        assert results[product_id] == limited(expected, 5, 10), product_id
+
+
+def test_price_rule_keeps_float64_precision():
+    # 0.33 vs 0.30 is just over 10% in float64 but inside it in float32
+    frame = catalog_snapshot.compact_frame(pd.DataFrame({"price": [0.30, 0.33]}))
+    assert frame["price"].dtype == np.float64
+    assert sp.score_matrix(
+        pd.DataFrame({"mst_category_id": [1, 2], "sub_category_id": [1, 2], "brand_id": [1, 2],
+                      "price": frame["price"]}),
+        np.array([0]), np.array([1])
+    )[0, 0] == 0
@@ -0,0 +1,108 @@
+import threading
+from collections import OrderedDict
+import mysql.connector
+from db_connector import load_config
+
+# --------------------------------------
+# TABLE VERSIONS
+# --------------------------------------
+# A table's version is its InnoDB UPDATE_TIME plus a counter bumped by this process's own
+# writes. UPDATE_TIME catches writers elsewhere (csv uploads, other workers, SQL clients);
+# the counter catches our own writes that land in the same second.
+UNSETTLED_SECONDS = 2       # UPDATE_TIME has 1s resolution; a table written this recently is not cached
+
+_write_counters = {}
+_counters_lock = threading.Lock()
+
+
+def bump_version(table_name):
+    """Call after every write to the table; its cached pages and ETags are invalid from now on"""
+    with _counters_lock:
+        _write_counters[table_name] = _write_counters.get(table_name, 0) + 1
+    view_cache.invalidate(table_name)
+
+
+def table_version(conn, cursor, table_name):
+    """Version token for the table, or None when it can't be trusted (UPDATE_TIME unknown or too fresh)"""
+    if not getattr(conn, "stats_expiry_off", False):
+        # MySQL 8 serves cached UPDATE_TIME values unless this is 0; 5.7 has no such variable
+        try:
+            cursor.execute("SET SESSION information_schema_stats_expiry = 0")
+        except mysql.connector.Error:
+            pass
+        conn.stats_expiry_off = True
+
+    cursor.execute("""
+        SELECT UNIX_TIMESTAMP(update_time) AS updated, UNIX_TIMESTAMP(NOW()) AS now
+        FROM information_schema.tables
+        WHERE table_schema = DATABASE()
+          AND table_name = %s
+    """, (table_name,))
+    row = cursor.fetchone()
+
+    # InnoDB forgets UPDATE_TIME on restart; without it a change can't be detected
+    if not row or row["updated"] is None:
+        return None
+    if row["now"] - row["updated"] < UNSETTLED_SECONDS:
+        return None
+
+    with _counters_lock:
+        writes = _write_counters.get(table_name, 0)
+    return f"{table_name}-{int(row['updated'])}-{writes}"
+
+
+# --------------------------------------
+# RECENT PAGE CACHE
+# --------------------------------------
+class ViewCache:
+    """LRU of recent /view results keyed by (table, query, version); a new version simply misses"""
+
+    def __init__(self, max_size=256, max_rows=5000):
+        self.max_size = max_size
+        self.max_rows = max_rows     # bigger results are not kept, they would crowd out everything else
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, value, row_count):
+        if row_count > self.max_rows:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, table_name):
+        with self._lock:
+            for key in [k for k in self._data if k[0] == table_name]:
+                del self._data[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_config = load_config()
+view_cache = ViewCache(
+    max_size=_config.getint('view', 'cache_size', fallback=256),
+    max_rows=_config.getint('view', 'cache_max_rows', fallback=5000),
+)
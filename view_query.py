@@ -0,0 +1,130 @@
+# --------------------------------------
+# SAFE QUERY LAYER FOR /view/<table_name>
+# --------------------------------------
+# Identifiers only ever come from the schema catalog; values are always bound as %s parameters.
+
+# ?col__op=value; a bare ?col=value means eq
+FILTER_OPS = {
+    "eq": "= %s",
+    "ne": "<> %s",
+    "gt": "> %s",
+    "gte": ">= %s",
+    "lt": "< %s",
+    "lte": "<= %s",
+    "like": "LIKE %s",
+}
+LIST_OPS = ("in", "between")
+AGGREGATES = ("count", "sum", "avg", "min", "max")
+INDEXED_KEYS = ("PRI", "UNI", "MUL")     # information_schema COLUMN_KEY of a leading index column
+FULL_SCAN_TYPES = ("ALL", "index")     # EXPLAIN access types that read every row
+
+
+class QueryError(ValueError):
+    """Bad filter / order / aggregate request; reported to the client as a 400"""
+
+
+def _column(table, name):
+    if table.column(name) is None:
+        raise QueryError(f"Unknown column '{name}'")
+    return f"`{name}`"
+
+
+def parse_filters(args, table, reserved):
+    """(where_sql, params) from the query string; where_sql is "" when nothing is filtered"""
+    clauses = []
+    params = []
+
+    for arg in args:
+        if arg in reserved:
+            continue
+
+        name, sep, op = arg.partition("__")
+        op = op or "eq"
+        if not sep and table.column(arg) is None:
+            raise QueryError(f"Unknown parameter or column '{arg}'")
+        col = _column(table, name)
+
+        for value in args.getlist(arg):
+            if op in FILTER_OPS:
+                clauses.append(f"{col} {FILTER_OPS[op]}")
+                params.append(value)
+            elif op == "in":
+                values = [v for v in value.split(",") if v != ""]
+                if not values:
+                    raise QueryError(f"{arg} needs at least one value")
+                clauses.append(f"{col} IN ({', '.join(['%s'] * len(values))})")
+                params.extend(values)
+            elif op == "between":
+                bounds = value.split(",")
+                if len(bounds) != 2:
+                    raise QueryError(f"{arg} needs exactly two values: low,high")
+                clauses.append(f"{col} BETWEEN %s AND %s")
+                params.extend(bounds)
+            elif op == "isnull":
+                is_null = value.lower() in ("1", "true", "yes")
+                clauses.append(f"{col} IS {'' if is_null else 'NOT '}NULL")
+            else:
+                raise QueryError(
+                    f"Unknown operator '{op}', use one of {list(FILTER_OPS) + list(LIST_OPS) + ['isnull']}"
+                )
+
+    where_sql = " WHERE " + " AND ".join(clauses) if clauses else ""
+    return where_sql, params
+
+
+def parse_order(order_by, table):
+    """?order_by=col,-col2 -- only indexed columns, so the sort never needs a filesort of the whole table"""
+    parts = []
+    for item in order_by.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        desc = item.startswith("-")
+        name = item.lstrip("-")
+        col = _column(table, name)
+        if table.column(name).key not in INDEXED_KEYS:
+            raise QueryError(f"Column '{name}' is not indexed and cannot be used in order_by")
+        parts.append(f"{col} DESC" if desc else col)
+
+    return " ORDER BY " + ", ".join(parts) if parts else ""
+
+
+def parse_aggregates(group_by, agg, table):
+    """?group_by=city&agg=count,sum:amount -> (select_sql, group_sql)"""
+    group_cols = [g.strip() for g in (group_by or "").split(",") if g.strip()]
+    select = [_column(table, g) for g in group_cols]
+
+    for item in (agg or "count").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        func, _, name = item.partition(":")
+        func = func.lower()
+        if func not in AGGREGATES:
+            raise QueryError(f"Unknown aggregate '{func}', use one of {list(AGGREGATES)}")
+
+        if func == "count" and not name:
+            select.append("COUNT(*) AS `count`")
+        elif not name:
+            raise QueryError(f"{func} needs a column: {func}:<column>")
+        else:
+            select.append(f"{func.upper()}({_column(table, name)}) AS `{func}_{name}`")
+
+    group_sql = " GROUP BY " + ", ".join(f"`{g}`" for g in group_cols) if group_cols else ""
+    return ", ".join(select), group_sql
+
+
+def check_scan(cursor, sql, params, max_scan_rows):
+    """EXPLAIN the query and refuse it when it would read more than max_scan_rows rows of a full table or index scan"""
+    cursor.execute("EXPLAIN " + sql, tuple(params))
+    for row in cursor.fetchall():
+        if isinstance(row, dict):
+            access, rows = row.get("type"), row.get("rows")
+        else:
+            access, rows = row[4], row[9]
+        # ALL is a table scan, index a full index scan (e.g. ORDER BY an index + unindexed filter)
+        if access in FULL_SCAN_TYPES and rows and int(rows) > max_scan_rows:
+            raise QueryError(
+                f"Query would scan about {int(rows)} rows without a selective index (limit {max_scan_rows}); "
+                f"filter on an indexed column"
+            )